@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+User = get_user_model()
+
+TOKEN_KEY = 'auth_token:{digest}'
+CACHED_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser')
+
+
+def token_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class LocalCache:
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenCache:
+
+    def __init__(self):
+        self.local = LocalCache(
+            settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_LOCAL_TIMEOUT
+        )
+
+    def get(self, key):
+        digest = token_digest(key)
+        entry = self.local.get(digest)
+        if entry is None:
+            entry = cache.get(TOKEN_KEY.format(digest=digest))
+            if entry is not None:
+                self.local.set(digest, entry)
+        return entry
+
+    def set(self, key, entry):
+        digest = token_digest(key)
+        cache.set(
+            TOKEN_KEY.format(digest=digest), entry,
+            settings.TOKEN_CACHE_TIMEOUT
+        )
+        self.local.set(digest, entry)
+
+    def revoke(self, *keys):
+        digests = [token_digest(key) for key in keys]
+        cache.delete_many([
+            TOKEN_KEY.format(digest=digest) for digest in digests
+        ])
+        for digest in digests:
+            self.local.delete(digest)
+
+
+token_cache = TokenCache()
+
+
+def revoke_user_tokens(user_id):
+    token_cache.revoke(*Token.objects.filter(user_id=user_id).values_list(
+        'key', flat=True
+    ))
+
+
+def lazy_user(entry):
+    values = dict(zip(CACHED_FIELDS, entry))
+    user = User.from_db(DEFAULT_DB_ALIAS, list(values), [
+        values[field.attname] for field in User._meta.concrete_fields
+        if field.attname in values
+    ])
+    user.load_deferred_together = True
+    return user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, tuple(
+                getattr(user, field) for field in CACHED_FIELDS
+            ))
+            return user, token
+        user = lazy_user(entry)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return user, Token(key=key, user=user)
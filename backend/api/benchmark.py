@@ -0,0 +1,167 @@
+import json
+import math
+import os
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from recipes.models import Ingredient
+from rest_framework.authtoken.models import Token
+from users.models import User
+
+from .metrics import QueryRecorder
+
+PERCENTILES = (50, 95, 99)
+RECIPE_PAGES = 5
+AUTOCOMPLETE_PREFIXES = 20
+
+
+def recipes_urls(benchmark):
+    return [
+        f'/api/recipes/?page={page}' for page in range(1, RECIPE_PAGES + 1)
+    ]
+
+
+def recipes_cursor_urls(benchmark):
+    return ['/api/recipes/?cursor=']
+
+
+def favorites_urls(benchmark):
+    return ['/api/recipes/?is_favorited=1']
+
+
+def subscriptions_urls(benchmark):
+    return ['/api/users/subscriptions/?recipes_limit=3']
+
+
+def shopping_cart_urls(benchmark):
+    return ['/api/recipes/download_shopping_cart/']
+
+
+def autocomplete_urls(benchmark):
+    names = list(Ingredient.objects.values_list('name', flat=True))
+    if not names:
+        return ['/api/ingredients/?name=а']
+    return [
+        f'/api/ingredients/?name={name[:benchmark.rng.randint(1, 3)]}'
+        for name in benchmark.rng.choices(names, k=AUTOCOMPLETE_PREFIXES)
+    ]
+
+
+SCENARIOS = {
+    'recipes': recipes_urls,
+    'recipes-cursor': recipes_cursor_urls,
+    'favorites': favorites_urls,
+    'subscriptions': subscriptions_urls,
+    'shopping-cart': shopping_cart_urls,
+    'ingredient-autocomplete': autocomplete_urls,
+}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def default_user():
+    user_id = User.objects.filter(is_active=True).annotate(
+        subscriptions=Count('follower')
+    ).order_by('-subscriptions', 'pk').values_list('pk', flat=True).first()
+    if user_id is None:
+        raise BenchmarkError('В базе нет пользователей')
+    return User.objects.get(pk=user_id)
+
+
+def percentile(values, rank):
+    return values[max(math.ceil(rank / 100 * len(values)) - 1, 0)]
+
+
+def client_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+    if '*' in settings.ALLOWED_HOSTS or not hosts:
+        return 'testserver'
+    return hosts[0].lstrip('.')
+
+
+class Benchmark:
+
+    def __init__(self, user, requests=100, warmup=10, seed=0):
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client = Client(
+            HTTP_AUTHORIZATION=f'Token {token.key}',
+            HTTP_HOST=client_host()
+        )
+        self.requests = requests
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+
+    def request(self, url):
+        response = self.client.get(url)
+        if response.status_code != 200:
+            raise BenchmarkError(f'{url}: статус {response.status_code}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, name):
+        urls = SCENARIOS[name](self)
+        for number in range(self.warmup):
+            self.request(urls[number % len(urls)])
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for number in range(self.requests):
+            recorder = QueryRecorder()
+            began = time.perf_counter()
+            with recorder.recording():
+                self.request(urls[number % len(urls)])
+            latencies.append(time.perf_counter() - began)
+            queries.append(recorder.count)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        result = {
+            f'p{rank}': round(percentile(latencies, rank) * 1000, 3)
+            for rank in PERCENTILES
+        }
+        result['rps'] = round(self.requests / elapsed, 1)
+        result['queries'] = max(queries)
+        return result
+
+    def run(self, names):
+        return {name: self.measure(name) for name in names}
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(path, results):
+    baseline = load_baseline(path)
+    baseline.setdefault(connection.vendor, {}).update(results)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baseline, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def regressions(results, baseline, tolerance):
+    expected = baseline.get(connection.vendor, {})
+    for name, result in results.items():
+        reference = expected.get(name)
+        if reference is None:
+            continue
+        if result['queries'] > reference['queries']:
+            yield (
+                f'{name}: SQL-запросов {result["queries"]}, '
+                f'в базовом замере {reference["queries"]}'
+            )
+        for rank in PERCENTILES[:2]:
+            key = f'p{rank}'
+            if result[key] > reference[key] * (1 + tolerance):
+                yield (
+                    f'{name}: {key} {result[key]} мс, '
+                    f'в базовом замере {reference[key]} мс'
+                )
@@ -0,0 +1,57 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'version:{namespace}'
+COUNTER_KEY = 'counter:{namespace}'
+
+
+def get_version(namespace):
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    version = time.time()
+    cache.set(VERSION_KEY.format(namespace=namespace), version, None)
+    return version
+
+
+def get_counter(namespace):
+    key = COUNTER_KEY.format(namespace=namespace)
+    counter = cache.get(key)
+    if counter is None:
+        cache.add(key, int(time.time() * 1000), None)
+        counter = cache.get(key)
+    return counter
+
+
+def increment_counter(namespace):
+    key = COUNTER_KEY.format(namespace=namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        counter = int(time.time() * 1000)
+        cache.set(key, counter, None)
+        return counter
+
+
+def make_key(namespace, version, *parts):
+    digest = hashlib.md5(
+        '&'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'{namespace}:{version}:{digest}'
+
+
+def get_or_set(key, default):
+    value = cache.get(key)
+    if value is None:
+        value = default()
+        cache.set(key, value, settings.API_CACHE_TIMEOUT)
+    return value
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [Warning(
+        f'Кеш {backend} не общий для процессов: версии кешей, индекс '
+        'ингредиентов и подбор рецептов не увидят изменений из других '
+        'воркеров и management-команд.',
+        hint='Укажите CACHE_BACKEND с общим хранилищем, например memcached.',
+        id='api.W001',
+    )]
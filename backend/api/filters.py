@@ -1,5 +1,12 @@
 from django_filters import rest_framework as filters
-from recipes.models import Ingredient, Recipe, Tag
+from recipes.models import Ingredient, Recipe, Tag, TagInRecipe
+from recipes.preferences import get_preferences
+from recipes.search import search
+from users.models import Subscription
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
 
 
 class RecipeFilter(filters.FilterSet):
@@ -7,32 +14,59 @@ class RecipeFilter(filters.FilterSet):
         field_name='tags__slug',
         to_field_name='slug',
         queryset=Tag.objects.all(),
-        label='Tags'
-    )
-    author = filters.CharFilter(
-        field_name='author__id',
-        lookup_expr='icontains'
+        label='Tags',
+        method='filter_tags'
     )
+    author = NumberInFilter(field_name='author_id', lookup_expr='in')
+    subscribed = filters.BooleanFilter(method='filter_subscribed')
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags', 'author', 'subscribed', 'is_favorited',
+            'is_in_shopping_cart', 'search'
+        )
+
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(
+            id__in=TagInRecipe.objects.filter(tag__in=value).values('recipe')
+        )
+
+    def filter_subscribed(self, queryset, name, value):
+        if not value:
+            return queryset
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset.none()
+        return queryset.filter(author__in=Subscription.objects.filter(
+            user=user
+        ).values('author'))
 
     def filter_is_favorited(self, queryset, name, value):
         if value:
-            return queryset.filter(favorite_recipe__user=self.request.user)
+            return queryset.filter(
+                id__in=get_preferences(self.request).favorites
+            )
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         if value:
             return queryset.filter(
-                shopping_cart_recipe__user=self.request.user
+                id__in=get_preferences(self.request).shopping_cart
             )
         return queryset
 
+    def filter_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return search(queryset, value)
+
 
 class IngredientFilter(filters.FilterSet):
     name = filters.CharFilter(
@@ -0,0 +1,301 @@
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers import base
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Deserializer
+from django.core.serializers.python import Serializer as PythonSerializer
+from django.db import connection
+from django.db.models import prefetch_related_objects
+from recipes.utils import batches
+
+CHUNK_SIZE = 64 * 1024
+SEPARATORS_RE = re.compile(r'[\s,\[\]]*')
+
+
+class FixtureError(Exception):
+    pass
+
+
+def iter_objects(file, chunk_size=CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+    while True:
+        position = SEPARATORS_RE.match(buffer, position).end()
+        if position < len(buffer):
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if eof:
+                    raise FixtureError(f'Некорректный JSON: {error}')
+            else:
+                yield obj
+                continue
+        elif eof:
+            return
+        chunk = file.read(chunk_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def get_model(label):
+    try:
+        return apps.get_model(label)
+    except (LookupError, ValueError):
+        raise FixtureError(f'Неизвестная модель: {label}')
+
+
+def model_dependencies(model):
+    for field in model._meta.get_fields(include_hidden=False):
+        if field.auto_created and not field.concrete:
+            continue
+        through = getattr(field.remote_field, 'through', None)
+        if through is not None and not through._meta.auto_created:
+            continue
+        if field.is_relation and field.related_model is not None:
+            yield field.related_model
+
+
+def sort_models(models):
+    models = set(models)
+    pending = {
+        model: {
+            dependency for dependency in model_dependencies(model)
+            if dependency in models and dependency is not model
+        }
+        for model in models
+    }
+    ordered = []
+    while pending:
+        ready = sorted(
+            (model for model, dependencies in pending.items()
+             if not dependencies),
+            key=lambda model: model._meta.label
+        ) or [min(pending, key=lambda model: model._meta.label)]
+        for model in ready:
+            del pending[model]
+            for dependencies in pending.values():
+                dependencies.discard(model)
+        ordered.extend(ready)
+    return ordered
+
+
+class Spool:
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+
+    def add(self, obj):
+        model = get_model(obj.get('model', ''))
+        file = self.files.get(model)
+        if file is None:
+            file = self.files[model] = open(
+                os.path.join(self.directory, model._meta.label),
+                'w+',
+                encoding='utf-8'
+            )
+        file.write(json.dumps(obj, ensure_ascii=False) + '\n')
+
+    def read(self, model):
+        file = self.files[model]
+        file.seek(0)
+        for line in file:
+            yield json.loads(line)
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace(
+        '\n', '\\n'
+    ).replace('\r', '\\r')
+
+
+def copy_rows(model, objects):
+    fields = model._meta.local_concrete_fields
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write('\t'.join(
+            copy_value(field.get_db_prep_save(
+                getattr(obj, field.attname), connection
+            ))
+            for field in fields
+        ) + '\n')
+    buffer.seek(0)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({columns}) FROM STDIN',
+            buffer
+        )
+
+
+class FixtureLoader:
+
+    def __init__(self, batch_size=2000, use_copy=False, ignore_conflicts=False,
+                 exclude=()):
+        self.batch_size = batch_size
+        self.use_copy = use_copy and connection.vendor == 'postgresql'
+        self.ignore_conflicts = ignore_conflicts
+        self.exclude = set(exclude)
+        self.loaded = {}
+
+    def excluded(self, label):
+        app_label = label.split('.')[0]
+        return app_label in self.exclude or label in self.exclude
+
+    def load(self, file, defer_constraints=False):
+        if not defer_constraints:
+            return self.load_file(file)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+        with connection.constraint_checks_disabled():
+            loaded = self.load_file(file)
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in loaded]
+        )
+        return loaded
+
+    def load_file(self, file):
+        with tempfile.TemporaryDirectory() as directory:
+            spool = Spool(directory)
+            try:
+                for obj in iter_objects(file):
+                    if not self.excluded(obj.get('model', '').lower()):
+                        spool.add(obj)
+                for model in sort_models(spool.files):
+                    self.load_model(model, spool.read(model))
+            finally:
+                spool.close()
+        self.reset_sequences()
+        return self.loaded
+
+    def load_model(self, model, objects):
+        loaded = 0
+        deserialized = Deserializer(objects, ignorenonexistent=True)
+        try:
+            for batch in batches(deserialized, self.batch_size):
+                self.insert(model, [item.object for item in batch])
+                self.insert_m2m(model, batch)
+                loaded += len(batch)
+        except base.DeserializationError as error:
+            raise FixtureError(f'{model._meta.label}: {error}')
+        self.loaded[model] = loaded
+
+    def insert(self, model, objects):
+        if self.use_copy and not self.ignore_conflicts:
+            copy_rows(model, objects)
+            return
+        fields = model._meta.local_concrete_fields
+        size = connection.ops.bulk_batch_size(fields, objects) or len(objects)
+        for batch in batches(objects, size):
+            model._base_manager._insert(
+                batch,
+                fields=fields,
+                raw=True,
+                ignore_conflicts=self.ignore_conflicts
+            )
+
+    def insert_m2m(self, model, items):
+        rows = defaultdict(list)
+        for item in items:
+            for name, values in (item.m2m_data or {}).items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                rows[through].extend(
+                    through(**{
+                        field.m2m_column_name(): item.object.pk,
+                        field.m2m_reverse_name(): value,
+                    })
+                    for value in values
+                )
+        for through, objects in rows.items():
+            through.objects.bulk_create(
+                objects, ignore_conflicts=self.ignore_conflicts
+            )
+
+    def reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self.loaded)
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+
+class StreamingSerializer(PythonSerializer):
+
+    def __init__(self, emit):
+        super().__init__()
+        self.emit = emit
+
+    def end_object(self, obj):
+        self.emit(self.get_dump_object(obj))
+        self._current = None
+
+
+def iter_instances(model, chunk_size):
+    queryset = model._base_manager.order_by(model._meta.pk.name)
+    m2m = [
+        field.name for field in model._meta.many_to_many
+        if field.remote_field.through._meta.auto_created
+    ]
+    for chunk in batches(queryset.iterator(chunk_size=chunk_size),
+                         chunk_size):
+        if m2m:
+            prefetch_related_objects(chunk, *m2m)
+        yield from chunk
+
+
+class FixtureEncoder(DjangoJSONEncoder):
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class FixtureWriter:
+
+    def __init__(self, stream, ndjson=False):
+        self.stream = stream
+        self.ndjson = ndjson
+        self.count = 0
+
+    def emit(self, obj):
+        data = json.dumps(obj, cls=FixtureEncoder, ensure_ascii=False)
+        if self.ndjson:
+            self.stream.write(data + '\n')
+        else:
+            self.stream.write(('[\n' if not self.count else ',\n') + data)
+        self.count += 1
+
+    def dump(self, models, chunk_size=2000):
+        for model in sort_models(models):
+            StreamingSerializer(self.emit).serialize(
+                iter_instances(model, chunk_size)
+            )
+        if not self.ndjson:
+            self.stream.write('\n]\n' if self.count else '[]\n')
+        return self.count
@@ -0,0 +1,223 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+METRICS = (
+    ('request_duration_seconds', 'Время обработки запроса.',
+     LATENCY_BUCKETS),
+    ('db_queries', 'Количество SQL-запросов на запрос.', QUERY_BUCKETS),
+    ('db_duration_seconds', 'Время выполнения SQL-запросов.',
+     LATENCY_BUCKETS),
+    ('serializer_duration_seconds', 'Время сериализации ответа.',
+     LATENCY_BUCKETS),
+    ('response_size_bytes', 'Размер ответа.', SIZE_BUCKETS),
+)
+METRIC_PREFIX = 'foodgram'
+BUDGET_COUNTER = 'query_budget_exceeded_total'
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+
+    def __init__(self, capture=False):
+        self.count = 0
+        self.db_duration = 0.0
+        self.queries = [] if capture else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.db_duration += time.perf_counter() - start
+            if self.queries is not None:
+                self.queries.append(sql)
+
+    @contextmanager
+    def recording(self, using=None):
+        aliases = [using] if using else connections
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+
+class RequestMetrics(QueryRecorder):
+
+    def __init__(self, capture=False):
+        super().__init__(capture)
+        self.duration = 0.0
+        self.serializer_duration = 0.0
+        self.size = 0
+
+    @contextmanager
+    def active(self):
+        previous = getattr(_local, 'metrics', None)
+        _local.metrics = self
+        start = time.perf_counter()
+        try:
+            with self.recording():
+                yield self
+        finally:
+            self.duration += time.perf_counter() - start
+            _local.metrics = previous
+
+    def values(self):
+        return {
+            'request_duration_seconds': self.duration,
+            'db_queries': self.count,
+            'db_duration_seconds': self.db_duration,
+            'serializer_duration_seconds': self.serializer_duration,
+            'response_size_bytes': self.size,
+        }
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{bound}', cumulative
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, view, method, values):
+        with self._lock:
+            for name, _, buckets in METRICS:
+                key = (name, view, method)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(buckets)
+                histogram.observe(values[name])
+
+    def increment(self, name, view, method):
+        with self._lock:
+            key = (name, view, method)
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        for metric, help_text, _ in METRICS:
+            name = f'{METRIC_PREFIX}_{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (key, view, method), histogram in histograms:
+                if key != metric:
+                    continue
+                labels = f'view="{view}",method="{method}"'
+                for bound, count in histogram.samples():
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+                    )
+                lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+                lines.append(
+                    f'{name}_count{{{labels}}} {sum(histogram.counts)}'
+                )
+        name = f'{METRIC_PREFIX}_{BUDGET_COUNTER}'
+        lines.append(f'# HELP {name} Превышения бюджета SQL-запросов.')
+        lines.append(f'# TYPE {name} counter')
+        for (_, view, method), count in counters:
+            lines.append(
+                f'{name}{{view="{view}",method="{method}"}} {count}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def current_metrics():
+    return getattr(_local, 'metrics', None)
+
+
+def time_serializer(serializer):
+    to_representation = serializer.to_representation
+
+    def timed(instance):
+        metrics = current_metrics()
+        if metrics is None:
+            return to_representation(instance)
+        start = time.perf_counter()
+        try:
+            return to_representation(instance)
+        finally:
+            metrics.serializer_duration += time.perf_counter() - start
+
+    serializer.to_representation = timed
+    return serializer
+
+
+def budget_message(label, limit, count, queries=None):
+    message = (
+        f'{label}: выполнено {count} SQL-запросов при бюджете {limit}.'
+    )
+    if queries:
+        message += '\n' + '\n'.join(
+            f'{number}. {sql}' for number, sql in enumerate(queries, 1)
+        )
+    return message
+
+
+def check_budget(method, view, metrics):
+    if settings.QUERY_BUDGET_ACTION == 'off':
+        return
+    label = f'{method} {view}'
+    limit = settings.QUERY_BUDGETS.get(label)
+    if limit is None or metrics.count <= limit:
+        return
+    registry.increment(BUDGET_COUNTER, view, method)
+    message = budget_message(label, limit, metrics.count, metrics.queries)
+    if settings.QUERY_BUDGET_ACTION == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_budget(limit, using=DEFAULT_DB_ALIAS):
+    recorder = QueryRecorder(capture=True)
+    with recorder.recording(using):
+        yield recorder
+    if recorder.count > limit:
+        raise QueryBudgetExceeded(budget_message(
+            'query_budget', limit, recorder.count, recorder.queries
+        ))
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import RequestMetrics, check_budget, registry
+
+METRICS_VIEW_NAME = 'metrics'
+UNRESOLVED_VIEW_NAME = 'unresolved'
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_VIEW_NAME
+    return match.view_name
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        budgets = (
+            settings.QUERY_BUDGETS and settings.QUERY_BUDGET_ACTION != 'off'
+        )
+        if not settings.METRICS_ENABLED and not budgets:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(
+            capture=settings.QUERY_BUDGET_ACTION == 'raise'
+        )
+        with metrics.active():
+            response = self.get_response(request)
+        view = get_view_name(request)
+        if view == METRICS_VIEW_NAME:
+            return response
+        if response.streaming:
+            response.streaming_content = self.stream(
+                response.streaming_content, metrics, request.method, view
+            )
+        else:
+            metrics.size = len(response.content)
+            self.finish(metrics, request.method, view)
+        return response
+
+    def stream(self, content, metrics, method, view):
+        try:
+            with metrics.active():
+                for chunk in content:
+                    metrics.size += len(chunk)
+                    yield chunk
+        finally:
+            self.finish(metrics, method, view)
+
+    def finish(self, metrics, method, view):
+        if settings.METRICS_ENABLED:
+            registry.observe(view, method, metrics.values())
+        check_budget(method, view, metrics)
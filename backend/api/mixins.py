@@ -0,0 +1,109 @@
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_or_set, get_version, make_key
+from .metrics import time_serializer
+
+
+class NotModified(Exception):
+
+    def __init__(self, response):
+        self.response = response
+
+
+class SerializerTimingMixin:
+
+    def get_serializer(self, *args, **kwargs):
+        return time_serializer(super().get_serializer(*args, **kwargs))
+
+
+class ConditionalGetMixin:
+    conditional_actions = ('list', 'retrieve')
+
+    def get_validators(self, request):
+        method = getattr(self, f'get_{self.action}_validators', None)
+        if method is None or self.action not in self.conditional_actions:
+            return None
+        return method(request)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        validators = self.get_validators(request)
+        if validators is None:
+            return
+        parts, last_modified = validators
+        self.etag = quote_etag(hashlib.md5('&'.join(
+            str(part)
+            for part in (request.accepted_renderer.format, *parts)
+        ).encode()).hexdigest())
+        if last_modified is not None:
+            self.last_modified = int(last_modified)
+        response = get_conditional_response(
+            request,
+            etag=self.etag,
+            last_modified=self.last_modified
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, 'etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            if self.last_modified is not None:
+                response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+
+def query_parts(request):
+    return sorted(
+        (key, value.strip())
+        for key, value in request.query_params.items()
+    )
+
+
+class CachedListMixin(ConditionalGetMixin):
+    cache_namespace = None
+
+    def get_list_validators(self, request):
+        version = get_version(self.cache_namespace)
+        return (self.cache_namespace, version, *query_parts(request)), version
+
+    def get_retrieve_validators(self, request):
+        version = get_version(self.cache_namespace)
+        return (self.cache_namespace, version, *self.kwargs.values()), version
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        key = make_key(
+            self.cache_namespace,
+            get_version(self.cache_namespace),
+            *query_parts(request)
+        )
+        return HttpResponse(
+            get_or_set(key, lambda: self.render_list(request)),
+            content_type=request.accepted_media_type
+        )
+
+    def render_list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(queryset, many=True)
+        return request.accepted_renderer.render(
+            serializer.data,
+            request.accepted_media_type,
+            self.get_renderer_context()
+        )
@@ -1,6 +1,124 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(
+        json.dumps([str(value) for value in values]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor, fields):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError(cursor)
+        values = [
+            field.to_python(value) for field, value in zip(fields, values)
+        ]
+        if None in values:
+            raise ValueError(cursor)
+        return values
+    except (TypeError, ValueError, ValidationError):
+        raise NotFound('Неверный курсор.')
+
+
+def keyset_filter(names, values):
+    first, *rest = names
+    if not rest:
+        return Q(**{f'{first}__lt': values[0]})
+    return Q(**{f'{first}__lte': values[0]}) & (
+        Q(**{f'{first}__lt': values[0]})
+        | (Q(**{first: values[0]}) & keyset_filter(rest, values[1:]))
+    )
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = 6
+
+
+class RecipePagination(CustomPagination):
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    cursor_fields = ('pub_date', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.count = None
+        if request.query_params.get(self.count_query_param):
+            self.count = queryset.count()
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(
+            *(f'-{name}' for name in self.cursor_fields)
+        )
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            fields = [
+                queryset.model._meta.get_field(name)
+                for name in self.cursor_fields
+            ]
+            queryset = queryset.filter(keyset_filter(
+                self.cursor_fields, decode_cursor(cursor, fields)
+            ))
+        results = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_cursor = encode_cursor(
+                getattr(results[-1], name) for name in self.cursor_fields
+            )
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict((
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        )))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor
+        )
+
+
+class FeedPagination(RecipePagination):
+
+    def paginate_feed(self, read, request, model):
+        self.cursor_mode = True
+        self.request = request
+        self.count = None
+        page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, [
+                model._meta.get_field(name) for name in self.cursor_fields
+            ])
+        entries = read(after, page_size + 1)
+        self.next_cursor = None
+        if len(entries) > page_size:
+            entries = entries[:page_size]
+            self.next_cursor = encode_cursor(entries[-1])
+        return entries
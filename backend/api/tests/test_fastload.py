@@ -0,0 +1,65 @@
+import io
+import json
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from recipes.models import FeedItem
+
+from .utils import api_client, create_recipe, create_user
+
+
+class FastloadRebuildTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        self.recipe = create_recipe(self.author)
+        self.client = api_client(self.reader)
+
+    def fastload(self, objects):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.json', encoding='utf-8'
+        ) as file:
+            json.dump(objects, file)
+            file.flush()
+            call_command('fastload', file.name, stdout=io.StringIO())
+
+    def flags(self):
+        data = self.client.get(f'/api/recipes/{self.recipe.pk}/').json()
+        return (
+            data['is_favorited'],
+            data['is_in_shopping_cart'],
+            data['author']['is_subscribed'],
+        )
+
+    def test_flags_and_feed_after_fastload(self):
+        self.assertEqual(self.flags(), (False, False, False))
+        self.assertEqual(
+            self.client.get('/api/recipes/feed/').json()['results'], []
+        )
+        self.fastload([
+            {
+                'model': 'recipes.favorites',
+                'pk': 1,
+                'fields': {'user': self.reader.pk, 'recipe': self.recipe.pk},
+            },
+            {
+                'model': 'recipes.shoppingcart',
+                'pk': 1,
+                'fields': {'user': self.reader.pk, 'recipe': self.recipe.pk},
+            },
+            {
+                'model': 'users.subscription',
+                'pk': 1,
+                'fields': {'user': self.reader.pk, 'author': self.author.pk},
+            },
+        ])
+        self.assertEqual(self.flags(), (True, True, True))
+        self.assertTrue(FeedItem.objects.filter(user=self.reader).exists())
+        results = self.client.get('/api/recipes/feed/').json()['results']
+        self.assertEqual(
+            [recipe['id'] for recipe in results], [self.recipe.pk]
+        )
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Ingredient
+
+
+def names(query):
+    return [item['name'] for item in ingredient_index.search(query)]
+
+
+class IngredientIndexTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_update_applies_own_change(self):
+        self.assertEqual(names('соль'), [])
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.assertEqual(names('соль'), ['соль'])
+
+    def test_change_from_another_process_is_not_lost(self):
+        names('соль')
+        Ingredient.objects.bulk_create([
+            Ingredient(name='соль морская', measurement_unit='г')
+        ])
+        ingredient_index.invalidate()
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.assertEqual(names('соль'), ['соль', 'соль морская'])
+
+    def test_rolled_back_change_is_ignored(self):
+        names('соль')
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Ingredient.objects.create(name='соль', measurement_unit='г')
+                raise RuntimeError
+        self.assertEqual(names('соль'), [])
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from .utils import (api_client, create_ingredients, create_recipe, create_tag,
+                    create_user)
+
+
+class RecipeDetailInvalidationTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        self.recipe = create_recipe(
+            self.author, [create_tag('breakfast')], create_ingredients(2)
+        )
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+        self.client = api_client(self.reader)
+
+    def detail(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag'], response.json()
+
+    def assertChanged(self, etag):
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code,
+            200
+        )
+        changed_etag, data = self.detail()
+        self.assertNotEqual(changed_etag, etag)
+        return data
+
+    def test_unchanged_detail_is_not_modified(self):
+        etag, data = self.detail()
+        self.assertEqual(self.detail(), (etag, data))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_favorite(self):
+        etag, data = self.detail()
+        self.assertFalse(data['is_favorited'])
+        response = self.client.post(f'{self.url}favorite/')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.assertChanged(etag)['is_favorited'])
+
+    def test_subscribe(self):
+        etag, data = self.detail()
+        self.assertFalse(data['author']['is_subscribed'])
+        response = self.client.post(
+            f'/api/users/{self.author.pk}/subscribe/'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.assertChanged(etag)['author']['is_subscribed'])
+
+    def test_edit(self):
+        etag, data = self.detail()
+        response = api_client(self.author).patch(
+            self.url, {'name': 'Новое название'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.assertChanged(etag)['name'], 'Новое название')
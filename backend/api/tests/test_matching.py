@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from recipes.matching import recipe_matcher
+from recipes.signals import send_recipes_updated
+
+from .utils import create_ingredients, create_recipe, create_user
+
+
+class RecipeMatcherTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_user('author')
+        self.ingredients = create_ingredients(2)
+        self.ids = [ingredient.pk for ingredient in self.ingredients]
+
+    def matched(self):
+        return [recipe_id for recipe_id, _, _ in recipe_matcher.match(
+            self.ids
+        )]
+
+    def test_update_applies_own_change(self):
+        self.assertEqual(self.matched(), [])
+        recipe = create_recipe(self.author, ingredients=self.ingredients)
+        send_recipes_updated((recipe.pk,))
+        self.assertEqual(self.matched(), [recipe.pk])
+
+    def test_change_from_another_process_is_not_lost(self):
+        self.matched()
+        imported = create_recipe(self.author, ingredients=self.ingredients)
+        recipe_matcher.invalidate()
+        recipe = create_recipe(self.author, ingredients=self.ingredients[:1])
+        send_recipes_updated((recipe.pk,))
+        self.assertEqual(self.matched(), [imported.pk, recipe.pk])
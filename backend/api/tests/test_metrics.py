@@ -0,0 +1,20 @@
+from django.test import TestCase, override_settings
+
+from .utils import api_client, create_user
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsViewTest(TestCase):
+
+    def test_metrics_require_staff(self):
+        user = create_user('user')
+        staff = create_user('staff')
+        staff.is_staff = True
+        staff.save()
+        self.assertEqual(api_client().get('/api/metrics/').status_code, 401)
+        self.assertEqual(
+            api_client(user).get('/api/metrics/').status_code, 403
+        )
+        response = api_client(staff).get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
@@ -0,0 +1,44 @@
+import base64
+import json
+
+from django.test import TestCase
+
+from .utils import api_client, create_user
+
+
+def cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+class MalformedCursorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('reader')
+
+    def setUp(self):
+        self.client = api_client(self.user)
+
+    def test_malformed_cursor_returns_not_found(self):
+        cursors = (
+            'W10=',
+            'e30=',
+            'не base64',
+            cursor([None, None]),
+            cursor(['2021-01-01T00:00:00']),
+            cursor(['2021-01-01T00:00:00', '1', '2']),
+            cursor(['не дата', '1']),
+            cursor({'pub_date': '2021-01-01T00:00:00', 'id': '1'}),
+        )
+        for url in ('/api/recipes/', '/api/recipes/feed/'):
+            for value in cursors:
+                with self.subTest(url=url, cursor=value):
+                    response = self.client.get(url, {'cursor': value})
+                    self.assertEqual(response.status_code, 404)
+
+    def test_valid_cursor(self):
+        response = self.client.get(
+            '/api/recipes/',
+            {'cursor': cursor(['2021-01-01T00:00:00+00:00', '1'])}
+        )
+        self.assertEqual(response.status_code, 200)
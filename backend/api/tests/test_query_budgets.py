@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+
+from api.metrics import query_budget
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from users.models import Subscription
+
+from .utils import (api_client, create_ingredients, create_recipe, create_tag,
+                    create_user, image_data)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class QueryBudgetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('cook')
+        cls.tags = [create_tag('breakfast'), create_tag('dinner')]
+        cls.ingredients = create_ingredients(40)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def get(self, name, url):
+        self.client.get(url)
+        with query_budget(settings.QUERY_BUDGETS[name]) as recorder:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return recorder.count
+
+    def create_recipe(self, ingredients):
+        with query_budget(
+            settings.QUERY_BUDGETS['POST recipes-list']
+        ) as recorder:
+            response = self.client.post('/api/recipes/', {
+                'name': 'Рецепт',
+                'text': 'Описание',
+                'cooking_time': 10,
+                'image': image_data(),
+                'tags': [tag.pk for tag in self.tags],
+                'ingredients': [
+                    {'id': ingredient.pk, 'amount': 1}
+                    for ingredient in ingredients
+                ],
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return recorder.count
+
+    def test_create_recipe(self):
+        self.create_recipe(self.ingredients[:1])
+        self.assertEqual(
+            self.create_recipe(self.ingredients[:1]),
+            self.create_recipe(self.ingredients)
+        )
+
+    def test_recipes_list(self):
+        author = create_user('author')
+        create_recipe(author, self.tags[:1], self.ingredients[:1])
+        single = self.get('GET recipes-list', '/api/recipes/')
+        for number in range(10):
+            create_recipe(author, self.tags, self.ingredients[number:][:10])
+        self.assertEqual(
+            self.get('GET recipes-list', '/api/recipes/'), single
+        )
+
+    def test_subscriptions(self):
+        url = '/api/users/subscriptions/?recipes_limit=3'
+        authors = [create_user(f'author{number}') for number in range(5)]
+        Subscription.objects.create(user=self.user, author=authors[0])
+        create_recipe(authors[0], self.tags, self.ingredients[:1])
+        single = self.get('GET users-subscriptions', url)
+        for author in authors[1:]:
+            Subscription.objects.create(user=self.user, author=author)
+            for _ in range(5):
+                create_recipe(author, self.tags, self.ingredients[:3])
+        self.assertEqual(self.get('GET users-subscriptions', url), single)
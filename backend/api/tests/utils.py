@@ -0,0 +1,64 @@
+import base64
+import io
+
+from PIL import Image
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import User
+
+
+def create_user(username):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        username=username,
+        first_name=username,
+        last_name=username,
+        password=f'{username}-password'
+    )
+
+
+def create_ingredients(amount):
+    return [
+        Ingredient.objects.create(
+            name=f'ингредиент {number}', measurement_unit='г'
+        )
+        for number in range(amount)
+    ]
+
+
+def create_tag(slug):
+    return Tag.objects.create(name=slug, color='#E26C2D', slug=slug)
+
+
+def create_recipe(author, tags=(), ingredients=(), name='Рецепт'):
+    recipe = Recipe.objects.create(
+        author=author,
+        name=name,
+        text='Описание',
+        image='recipes/images/recipe.png',
+        cooking_time=10
+    )
+    recipe.tags.set(tags)
+    IngredientInRecipe.objects.bulk_create(
+        IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=1)
+        for ingredient in ingredients
+    )
+    return recipe
+
+
+def image_data():
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), '#E26C2D').save(buffer, 'PNG')
+    return (
+        'data:image/png;base64,'
+        + base64.b64encode(buffer.getvalue()).decode()
+    )
+
+
+def api_client(user=None):
+    client = APIClient()
+    if user is not None:
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
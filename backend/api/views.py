@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@api_view(('GET',))
+@permission_classes((IsAdminUser,))
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(
+        registry.render(),
+        content_type=PROMETHEUS_CONTENT_TYPE
+    )
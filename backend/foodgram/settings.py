@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -33,6 +34,7 @@ INSTALLED_APPS = (
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = (
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,6 +85,47 @@ else:
         },
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'foodgram_cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=10000)),
+        },
+    }
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=60 * 60))
+
+INGREDIENT_SEARCH_LIMIT = 50
+
+FEED_FANOUT_THRESHOLD = int(os.getenv('FEED_FANOUT_THRESHOLD', default=1000))
+FEED_BACKFILL_SIZE = 50
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', default='True' if DEBUG else '') == 'True'
+QUERY_BUDGET_ACTION = os.getenv('QUERY_BUDGET_ACTION', default='log' if DEBUG else 'off')
+QUERY_BUDGETS = {
+    'GET recipes-list': 8,
+    'GET recipes-detail': 8,
+    'GET recipes-feed': 8,
+    'GET recipes-cook': 8,
+    'GET recipes-download-shopping-cart': 3,
+    'POST recipes-list': 24,
+    'GET users-list': 6,
+    'GET users-detail': 5,
+    'GET users-me': 3,
+    'GET users-subscriptions': 5,
+    'GET tags-list': 3,
+    'GET ingredients-list': 3,
+}
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TIMEOUT = 5 * 60
+TOKEN_CACHE_LOCAL_TIMEOUT = 10
+
+BENCHMARK_BASELINE = os.getenv(
+    'BENCHMARK_BASELINE', default=os.path.join(BASE_DIR, 'benchmark.json')
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -103,7 +146,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
@@ -143,3 +186,9 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+DEFAULT_FILE_STORAGE = 'recipes.storage.ContentAddressedStorage'
+
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', default=2))
+RECIPE_THUMBNAIL_SIZES = (320, 640)
+RECIPE_LIST_THUMBNAIL_SIZE = 640
+RECIPE_PREVIEW_THUMBNAIL_SIZE = 320
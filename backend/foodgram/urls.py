@@ -1,3 +1,4 @@
+from api.views import metrics_view
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -5,6 +6,7 @@ from django.urls import include, path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', metrics_view, name='metrics'),
     path('api/', include('users.urls')),
     path('api/', include('recipes.urls')),
 ]
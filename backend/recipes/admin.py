@@ -3,6 +3,7 @@ from users.mixins import DisplayEmptyFieldMixin
 
 from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
                      ShoppingCart, Tag, TagInRecipe)
+from .signals import send_recipes_updated
 
 
 class IngredientInRecipeInline(admin.TabularInline):
@@ -46,8 +47,13 @@ class RecipeAdmin(DisplayEmptyFieldMixin, admin.ModelAdmin):
     inlines = (IngredientInRecipeInline, TagInRecipeInline)
     exclude = ('tags', 'ingredients')
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        send_recipes_updated((form.instance.pk,))
+
     def count_favorite(self, obj):
-        return obj.favorite_recipe.count()
+        return obj.favorites_count
+    count_favorite.admin_order_field = 'favorites_count'
 
 
 @admin.register(Favorites)
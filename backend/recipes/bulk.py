@@ -0,0 +1,232 @@
+import base64
+import json
+import mimetypes
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, connection, transaction
+
+from . import feed
+from .counters import increment
+from .images import schedule_processing
+from .models import Ingredient, IngredientInRecipe, Recipe, Tag, TagInRecipe
+from .serializers import RecipeRecordSerializer, id_errors
+from .signals import send_recipes_updated
+from .utils import batches
+
+User = get_user_model()
+
+
+def ingredient_errors(ingredients, found):
+    names = [ingredient['name'] for ingredient in ingredients]
+    messages = id_errors('Ингредиент', names, found)
+    for ingredient in ingredients:
+        unit = ingredient.get('measurement_unit')
+        known = found.get(ingredient['name'])
+        if known and unit and unit != known.measurement_unit:
+            messages.append(
+                f'Ингредиент {known.name} измеряется в '
+                f'{known.measurement_unit}!'
+            )
+    return messages
+
+
+class RecipeImporter:
+
+    def __init__(self, author=None, trust_authors=False, trust_paths=False,
+                 batch_size=500, dry_run=False):
+        self.author = author
+        self.trust_authors = trust_authors
+        self.trust_paths = trust_paths
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.created = 0
+        self.errors = []
+
+    def run(self, lines):
+        for batch in batches(enumerate(lines, 1), self.batch_size):
+            records = self.resolve(self.parse(batch))
+            if records and not self.dry_run:
+                self.write(records)
+            elif records:
+                self.created += len(records)
+        return self.report()
+
+    def report(self):
+        return {
+            'created': self.created,
+            'failed': len(self.errors),
+            'errors': sorted(self.errors, key=itemgetter('line')),
+        }
+
+    def add_error(self, line_no, errors):
+        self.errors.append({'line': line_no, 'errors': errors})
+
+    def parse(self, batch):
+        records = []
+        for line_no, line in batch:
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+            except ValueError:
+                self.add_error(
+                    line_no, {'non_field_errors': ['Некорректный JSON!']}
+                )
+                continue
+            serializer = RecipeRecordSerializer(
+                data=data, context={'trust_paths': self.trust_paths}
+            )
+            if serializer.is_valid():
+                records.append((line_no, serializer.validated_data))
+            else:
+                self.add_error(line_no, serializer.errors)
+        return records
+
+    def lookup(self, records):
+        tags = Tag.objects.in_bulk(
+            {slug for _, record in records for slug in record['tags']},
+            field_name='slug'
+        )
+        ingredients = Ingredient.objects.in_bulk(
+            {
+                ingredient['name']
+                for _, record in records
+                for ingredient in record['ingredients']
+            },
+            field_name='name'
+        )
+        authors = {}
+        if self.trust_authors:
+            authors = User.objects.in_bulk(
+                {
+                    record['author']
+                    for _, record in records if 'author' in record
+                },
+                field_name='email'
+            )
+        return tags, ingredients, authors
+
+    def get_author(self, record, authors):
+        email = record.get('author') if self.trust_authors else None
+        if email:
+            return authors.get(email), f'Пользователь {email} не найден!'
+        return self.author, 'Обязательное поле.'
+
+    def resolve(self, records):
+        tags, ingredients, authors = self.lookup(records)
+        resolved = []
+        for line_no, record in records:
+            errors = {}
+            author, author_error = self.get_author(record, authors)
+            if author is None:
+                errors['author'] = [author_error]
+            messages = id_errors('Тег', record['tags'], tags)
+            if messages:
+                errors['tags'] = messages
+            messages = ingredient_errors(record['ingredients'], ingredients)
+            if messages:
+                errors['ingredients'] = messages
+            if errors:
+                self.add_error(line_no, errors)
+                continue
+            recipe = Recipe(
+                author=author,
+                name=record['name'],
+                text=record['text'],
+                image=record['image'],
+                cooking_time=record['cooking_time'],
+            )
+            resolved.append((line_no, recipe, [
+                tags[slug] for slug in record['tags']
+            ], [
+                (ingredients[ingredient['name']], ingredient['amount'])
+                for ingredient in record['ingredients']
+            ]))
+        return resolved
+
+    def write(self, records):
+        recipes = [recipe for _, recipe, _, _ in records]
+        try:
+            with transaction.atomic():
+                self.save_recipes(recipes)
+                TagInRecipe.objects.bulk_create([
+                    TagInRecipe(recipe=recipe, tag=tag)
+                    for _, recipe, tags, _ in records for tag in tags
+                ])
+                IngredientInRecipe.objects.bulk_create([
+                    IngredientInRecipe(
+                        recipe=recipe,
+                        ingredient=ingredient,
+                        amount=amount
+                    )
+                    for _, recipe, _, ingredients in records
+                    for ingredient, amount in ingredients
+                ])
+                for recipe in recipes:
+                    schedule_processing(recipe)
+                send_recipes_updated(recipe.pk for recipe in recipes)
+                feed.publish(recipes)
+        except DatabaseError as error:
+            for line_no, _, _, _ in records:
+                self.add_error(line_no, {'non_field_errors': [str(error)]})
+            return
+        self.created += len(recipes)
+
+    def save_recipes(self, recipes):
+        if not connection.features.can_return_ids_from_bulk_insert:
+            for recipe in recipes:
+                recipe.save()
+            return
+        Recipe.objects.bulk_create(recipes)
+        authors = Counter(recipe.author_id for recipe in recipes)
+        for author_id, amount in authors.items():
+            increment(User, author_id, 'recipes_count', amount)
+
+
+def encode_image(name):
+    content_type = mimetypes.guess_type(name)[0] or 'image/jpeg'
+    with default_storage.open(name) as file:
+        content = base64.b64encode(file.read()).decode()
+    return f'data:{content_type};base64,{content}'
+
+
+def export_recipes(queryset, chunk_size=500, embed_images=False):
+    recipes = queryset.select_related('author').order_by('pk').iterator(
+        chunk_size=chunk_size
+    )
+    for chunk in batches(recipes, chunk_size):
+        ids = [recipe.pk for recipe in chunk]
+        tags = defaultdict(list)
+        for recipe_id, slug in TagInRecipe.objects.filter(
+            recipe_id__in=ids
+        ).values_list('recipe_id', 'tag__slug').order_by('pk'):
+            tags[recipe_id].append(slug)
+        ingredients = defaultdict(list)
+        for recipe_id, name, unit, amount in IngredientInRecipe.objects.filter(
+            recipe_id__in=ids
+        ).values_list(
+            'recipe_id', 'ingredient__name', 'ingredient__measurement_unit',
+            'amount'
+        ).order_by('pk'):
+            ingredients[recipe_id].append({
+                'name': name, 'measurement_unit': unit, 'amount': amount
+            })
+        for recipe in chunk:
+            image = recipe.image.name
+            if embed_images and default_storage.exists(image):
+                image = encode_image(image)
+            yield json.dumps({
+                'author': recipe.author.email,
+                'name': recipe.name,
+                'text': recipe.text,
+                'cooking_time': recipe.cooking_time,
+                'pub_date': recipe.pub_date.isoformat(),
+                'image': image,
+                'tags': tags[recipe.pk],
+                'ingredients': ingredients[recipe.pk],
+            }, ensure_ascii=False) + '\n'
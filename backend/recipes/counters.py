@@ -0,0 +1,35 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def increment(model, pk, field, amount=1):
+    model.objects.filter(pk=pk).update(**{field: F(field) + amount})
+
+
+def decrement(model, pk, field):
+    model.objects.filter(pk=pk, **{f'{field}__gt': 0}).update(
+        **{field: F(field) - 1}
+    )
+
+
+def count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total')
+        ),
+        0
+    )
+
+
+def recount(model, field, related_model, related_field):
+    actual = count_subquery(related_model, related_field)
+    drifted = model.objects.annotate(actual=actual).exclude(
+        **{field: F('actual')}
+    ).values_list('pk', flat=True)
+    return model.objects.filter(pk__in=list(drifted)).update(
+        **{field: actual}
+    )
@@ -0,0 +1,74 @@
+from api.cache import bump_version, get_version
+from django.conf import settings
+from django.core.cache import cache
+from users.models import Subscription
+
+from .preferences import get_preferences
+
+NAMESPACE = 'recipe_detail'
+CACHE_KEY = 'recipe_detail:{recipe_id}'
+RECIPE_FLAGS = ('is_favorited', 'is_in_shopping_cart')
+AUTHOR_FLAGS = ('is_subscribed',)
+PLACEHOLDER = 'null'
+
+
+def cacheable(request):
+    return (
+        request.accepted_renderer.format == 'json'
+        and 'indent' not in request.accepted_media_type
+    )
+
+
+def detail_version():
+    return get_version(NAMESPACE)
+
+
+def invalidate_all():
+    bump_version(NAMESPACE)
+
+
+def invalidate(recipe_id):
+    cache.delete(CACHE_KEY.format(recipe_id=recipe_id))
+
+
+def get_detail(recipe_id, parts):
+    entry = cache.get(CACHE_KEY.format(recipe_id=recipe_id))
+    if entry is None or entry[0] != parts:
+        return None
+    return entry[1]
+
+
+def set_detail(recipe_id, parts, content):
+    cache.set(
+        CACHE_KEY.format(recipe_id=recipe_id),
+        (parts, content),
+        settings.API_CACHE_TIMEOUT
+    )
+
+
+def render_detail(data, renderer, renderer_context):
+    data = dict(data, author=dict(data['author']))
+    for name in RECIPE_FLAGS:
+        data[name] = None
+    for name in AUTHOR_FLAGS:
+        data['author'][name] = None
+    return renderer.render(data, 'application/json', renderer_context)
+
+
+def merge_user_flags(content, request, recipe_id, author_id):
+    preferences = get_preferences(request)
+    user = request.user
+    flags = {
+        'is_favorited': preferences.is_favorited(recipe_id),
+        'is_in_shopping_cart': preferences.is_in_shopping_cart(recipe_id),
+        'is_subscribed': user.is_authenticated and Subscription.objects.filter(
+            user=user, author_id=author_id
+        ).exists(),
+    }
+    for name, value in flags.items():
+        content = content.replace(
+            f'"{name}":{PLACEHOLDER}'.encode(),
+            f'"{name}":{"true" if value else "false"}'.encode(),
+            1
+        )
+    return content
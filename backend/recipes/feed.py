@@ -0,0 +1,87 @@
+from heapq import merge
+
+from api.pagination import keyset_filter
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from users.models import Subscription, User
+
+from .models import FeedItem, Recipe
+from .utils import batches, group_pairs
+
+FEED_BATCH_SIZE = 1000
+
+
+def fanout_authors(author_ids):
+    return set(User.objects.filter(
+        pk__in=author_ids,
+        followers_count__lte=settings.FEED_FANOUT_THRESHOLD
+    ).values_list('pk', flat=True))
+
+
+def publish(recipes):
+    recipes = list(recipes)
+    authors = fanout_authors({recipe.author_id for recipe in recipes})
+    if not authors:
+        return
+    followers = group_pairs(Subscription.objects.filter(
+        author__in=authors
+    ).values_list('author_id', 'user_id').iterator())
+    items = (
+        FeedItem(
+            user_id=user_id,
+            recipe_id=recipe.pk,
+            author_id=recipe.author_id,
+            pub_date=recipe.pub_date
+        )
+        for recipe in recipes
+        for user_id in followers.get(recipe.author_id, ())
+    )
+    for batch in batches(items, FEED_BATCH_SIZE):
+        FeedItem.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def publish_all(batch_size=FEED_BATCH_SIZE):
+    recipes = Recipe.objects.order_by().only('pk', 'author_id', 'pub_date')
+    for batch in batches(recipes.iterator(), batch_size):
+        publish(batch)
+
+
+def backfill(user_id, author_id):
+    if not fanout_authors((author_id,)):
+        return
+    recipes = Recipe.objects.filter(author_id=author_id).values_list(
+        'pk', 'pub_date'
+    )[:settings.FEED_BACKFILL_SIZE]
+    FeedItem.objects.bulk_create([
+        FeedItem(
+            user_id=user_id,
+            recipe_id=recipe_id,
+            author_id=author_id,
+            pub_date=pub_date
+        )
+        for recipe_id, pub_date in recipes
+    ], ignore_conflicts=True)
+
+
+def retract(user_id, author_id):
+    FeedItem.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def read(user, after, limit):
+    pushed = FeedItem.objects.filter(user=user).order_by(
+        '-pub_date', '-recipe_id'
+    ).values_list('pub_date', 'recipe_id')
+    pulled = Recipe.objects.filter(
+        author__in=Subscription.objects.filter(
+            user=user,
+            author__followers_count__gt=settings.FEED_FANOUT_THRESHOLD
+        ).values('author')
+    ).annotate(pushed=Exists(FeedItem.objects.filter(
+        user=user, recipe=OuterRef('pk')
+    ))).filter(pushed=False).order_by('-pub_date', '-id').values_list(
+        'pub_date', 'id'
+    )
+    if after is not None:
+        pushed = pushed.filter(keyset_filter(('pub_date', 'recipe_id'), after))
+        pulled = pulled.filter(keyset_filter(('pub_date', 'id'), after))
+    return list(merge(pushed[:limit], pulled[:limit], reverse=True))[:limit]
@@ -0,0 +1,137 @@
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F
+from PIL import Image, ImageOps
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+IMAGES_DIR = 'recipes/images'
+THUMBNAILS_DIR = 'recipes/thumbnails'
+REENCODED_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+ALPHA_MODES = ('RGBA', 'LA', 'PA')
+ENCODE_OPTIONS = {'JPEG': {'quality': 90}, 'WEBP': {'quality': 90}}
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix='recipe-images'
+)
+
+
+def thumbnail_name(base, size, webp=False):
+    name = f'{base}_{size}.jpg'
+    return f'{name}.webp' if webp else name
+
+
+def thumbnail_names(base):
+    for size in settings.RECIPE_THUMBNAIL_SIZES:
+        yield thumbnail_name(base, size)
+        yield thumbnail_name(base, size, webp=True)
+
+
+def schedule_processing(recipe):
+    recipe_id, name = recipe.pk, recipe.image.name
+    transaction.on_commit(
+        lambda: executor.submit(process_recipe_image, recipe_id, name)
+    )
+
+
+def release_files(image_name, thumbnail):
+    transaction.on_commit(
+        lambda: delete_unreferenced(image_name, thumbnail)
+    )
+
+
+def delete_unreferenced(image_name, thumbnail):
+    if image_name and not Recipe.objects.filter(image=image_name).exists():
+        default_storage.delete(image_name)
+    if thumbnail and not Recipe.objects.filter(thumbnail=thumbnail).exists():
+        for name in thumbnail_names(thumbnail):
+            default_storage.delete(name)
+
+
+def process_recipe_image(recipe_id, name):
+    try:
+        image_name, thumbnail = build_variants(name)
+        updated = Recipe.objects.filter(pk=recipe_id, image=name).update(
+            image=image_name,
+            thumbnail=thumbnail,
+            version=F('version') + 1
+        )
+        if updated and image_name != name:
+            delete_unreferenced(name, None)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+    finally:
+        connection.close()
+
+
+def save_once(name, content):
+    if not default_storage.exists(name):
+        default_storage.save(name, content)
+
+
+def encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def file_digest(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def flatten(image):
+    if image.mode in ALPHA_MODES or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def build_variants(name):
+    with default_storage.open(name) as file:
+        digest = file_digest(file)
+        image = Image.open(file)
+        image.load()
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        extension = REENCODED_FORMATS.get(image_format)
+        if extension is None:
+            extension = os.path.splitext(name)[1]
+            file.seek(0)
+            content = file
+        else:
+            content = ContentFile(encode(
+                image, image_format, **ENCODE_OPTIONS.get(image_format, {})
+            ))
+        image_name = f'{IMAGES_DIR}/{digest}{extension}'
+        save_once(image_name, content)
+    base = f'{THUMBNAILS_DIR}/{digest[:2]}/{digest}'
+    image = flatten(image)
+    for size in settings.RECIPE_THUMBNAIL_SIZES:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.LANCZOS)
+        save_once(
+            thumbnail_name(base, size),
+            ContentFile(encode(thumbnail, 'JPEG', quality=85, optimize=True))
+        )
+        save_once(
+            thumbnail_name(base, size, webp=True),
+            ContentFile(encode(thumbnail, 'WEBP', quality=80))
+        )
+    return image_name, base
@@ -0,0 +1,112 @@
+import bisect
+import threading
+
+from api.cache import bump_version, get_counter, increment_counter
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import Ingredient
+
+NAMESPACE = 'ingredients'
+COUNTER = 'ingredient_index'
+MAX_CHAR = chr(0x10FFFF)
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._items = {}
+        self._version = None
+
+    def warm_up(self):
+        try:
+            self._ensure_fresh()
+        except DatabaseError:
+            pass
+
+    def rebuild(self, version=None):
+        if version is None:
+            version = get_counter(COUNTER)
+        items = {
+            row['id']: row
+            for row in Ingredient.objects.values(
+                'id', 'name', 'measurement_unit'
+            ).iterator()
+        }
+        keys = sorted(
+            (item['name'].casefold(), pk) for pk, item in items.items()
+        )
+        with self._lock:
+            self._keys, self._items, self._version = keys, items, version
+
+    def update(self, ingredient):
+        version = self.invalidate()
+        with self._lock:
+            if self._version != version - 1:
+                self._version = None
+                return
+            self._remove(ingredient.pk)
+            item = {
+                'id': ingredient.pk,
+                'name': ingredient.name,
+                'measurement_unit': ingredient.measurement_unit,
+            }
+            keys = list(self._keys)
+            bisect.insort(keys, (ingredient.name.casefold(), ingredient.pk))
+            self._keys = keys
+            self._items = {**self._items, ingredient.pk: item}
+            self._version = version
+
+    def remove(self, pk):
+        version = self.invalidate()
+        with self._lock:
+            if self._version != version - 1:
+                self._version = None
+                return
+            self._remove(pk)
+            self._version = version
+
+    def invalidate(self):
+        bump_version(NAMESPACE)
+        return increment_counter(COUNTER)
+
+    def _remove(self, pk):
+        item = self._items.get(pk)
+        if item is None:
+            return
+        keys = list(self._keys)
+        del keys[bisect.bisect_left(keys, (item['name'].casefold(), pk))]
+        items = dict(self._items)
+        del items[pk]
+        self._keys, self._items = keys, items
+
+    def search(self, query, measurement_unit=None, limit=None):
+        self._ensure_fresh()
+        keys, items = self._keys, self._items
+        if limit is None:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        query = query.strip().casefold()
+        start = bisect.bisect_left(keys, (query,))
+        end = bisect.bisect_left(keys, (query + MAX_CHAR,), lo=start)
+        matches = keys[start:end]
+        if query and len(matches) < limit:
+            matches += [
+                key for key in keys[:start] + keys[end:] if query in key[0]
+            ]
+        results = (items[pk] for _, pk in matches)
+        if measurement_unit is not None:
+            results = (
+                item for item in results
+                if item['measurement_unit'] == measurement_unit
+            )
+        return [item for item, _ in zip(results, range(limit))]
+
+    def _ensure_fresh(self):
+        version = get_counter(COUNTER)
+        if version != self._version:
+            self.rebuild(version)
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,86 @@
+from api.benchmark import (PERCENTILES, SCENARIOS, Benchmark, BenchmarkError,
+                           default_user, load_baseline, regressions,
+                           save_baseline)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки, пропускную способность и число SQL-запросов '
+        'основных эндпоинтов и сравнивает их с базовым замером'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=SCENARIOS,
+            help='Сценарий замера, по умолчанию - все'
+        )
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--user',
+            help='Email пользователя, от имени которого идут запросы'
+        )
+        parser.add_argument('--baseline', default=settings.BENCHMARK_BASELINE)
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Сохранить результаты как базовый замер'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Допустимое ухудшение задержек, доля от базового замера'
+        )
+
+    def get_user(self, email):
+        if email is None:
+            return default_user()
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f'Пользователь {email} не найден')
+        return user
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть больше нуля')
+        if settings.DEBUG:
+            self.stderr.write('DEBUG включён: задержки будут завышены')
+        try:
+            benchmark = Benchmark(
+                self.get_user(options['user']),
+                requests=options['requests'],
+                warmup=options['warmup'],
+                seed=options['seed']
+            )
+            results = benchmark.run(options['scenario'] or list(SCENARIOS))
+        except BenchmarkError as error:
+            raise CommandError(error)
+        columns = [f'p{rank}' for rank in PERCENTILES] + ['rps', 'queries']
+        self.stdout.write(f'{connection.vendor}: {len(results)} сценариев')
+        self.stdout.write(
+            f'{"scenario":<24}' + ''.join(f'{key:>10}' for key in columns)
+        )
+        for name, result in results.items():
+            self.stdout.write(f'{name:<24}' + ''.join(
+                f'{result[key]:>10}' for key in columns
+            ))
+        if options['update_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовый замер сохранён в {options["baseline"]}'
+            ))
+            return
+        failed = list(regressions(
+            results, load_baseline(options['baseline']), options['tolerance']
+        ))
+        if failed:
+            raise CommandError('Регрессия:\n' + '\n'.join(failed))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
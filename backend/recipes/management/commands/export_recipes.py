@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from recipes.bulk import export_recipes
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты в формате NDJSON (по рецепту на строку)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            nargs='?',
+            default='-',
+            help='Файл для выгрузки, по умолчанию - стандартный вывод'
+        )
+        parser.add_argument(
+            '--author',
+            help='Выгрузить только рецепты автора с указанным email'
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--embed-images',
+            action='store_true',
+            help='Встроить картинки в выгрузку в base64'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+        queryset = Recipe.objects.all()
+        if options['author']:
+            queryset = queryset.filter(author__email=options['author'])
+        lines = export_recipes(
+            queryset,
+            chunk_size=options['chunk_size'],
+            embed_images=options['embed_images']
+        )
+        if options['file'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        total = 0
+        with open(options['file'], 'w', encoding='utf-8') as file:
+            for line in lines:
+                file.write(line)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f'Выгружено рецептов: {total}'))
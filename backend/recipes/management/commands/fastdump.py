@@ -0,0 +1,81 @@
+import gzip
+import sys
+from contextlib import nullcontext
+
+from api.fixtures import FixtureWriter
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+
+def open_output(name):
+    if name is None:
+        return nullcontext(sys.stdout)
+    if name.endswith('.gz'):
+        return gzip.open(name, 'wt', encoding='utf-8')
+    return open(name, 'w', encoding='utf-8')
+
+
+def get_models(labels):
+    if not labels:
+        return apps.get_models()
+    models = []
+    for label in labels:
+        try:
+            if '.' in label:
+                models.append(apps.get_model(label))
+            else:
+                models.extend(apps.get_app_config(label).get_models())
+        except LookupError:
+            raise CommandError(f'Неизвестное приложение или модель: {label}')
+    return models
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает данные в фикстуру JSON или NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels',
+            nargs='*',
+            help='Приложения или модели (app_label.ModelName), по умолчанию '
+                 '- все'
+        )
+        parser.add_argument(
+            '-e', '--exclude',
+            action='append',
+            default=[],
+            help='Пропустить приложение или модель (app_label.ModelName)'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки, по умолчанию - стандартный вывод'
+        )
+        parser.add_argument(
+            '--format',
+            choices=('json', 'ndjson'),
+            help='Формат выгрузки (по расширению файла)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+        output = options['output']
+        file_format = options['format'] or (
+            'ndjson' if output and '.ndjson' in output else 'json'
+        )
+        excluded = {label.lower() for label in options['exclude']}
+        models = [
+            model for model in get_models(options['labels'])
+            if model._meta.managed and not model._meta.proxy
+            and model._meta.app_label not in excluded
+            and model._meta.label_lower not in excluded
+        ]
+        with open_output(output) as stream:
+            total = FixtureWriter(stream, ndjson=file_format == 'ndjson').dump(
+                models, options['chunk_size']
+            )
+        if output:
+            self.stdout.write(self.style.SUCCESS(
+                f'Выгружено объектов: {total}'
+            ))
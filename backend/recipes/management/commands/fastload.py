@@ -0,0 +1,96 @@
+import gzip
+import sys
+from contextlib import nullcontext
+
+from api.cache import bump_version
+from api.fixtures import FixtureError, FixtureLoader
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from recipes import detail_cache, feed
+from recipes.ingredient_index import ingredient_index
+from recipes.matching import recipe_matcher
+from recipes.preferences import invalidate_all_preferences
+from users.versions import USERS_NAMESPACE
+
+REBUILT_APPS = ('recipes', 'users')
+
+
+def open_fixture(name):
+    if name == '-':
+        return nullcontext(sys.stdin)
+    if name.endswith('.gz'):
+        return gzip.open(name, 'rt', encoding='utf-8')
+    return open(name, 'r', encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает фикстуры JSON или NDJSON: потоковый разбор, '
+        'пакетная вставка по моделям в порядке зависимостей'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='+',
+            help='Файлы фикстур (.json, .ndjson, .gz), "-" - стандартный ввод'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '-e', '--exclude',
+            action='append',
+            default=[],
+            help='Пропустить приложение или модель (app_label.ModelName)'
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать записи, которые уже есть в базе'
+        )
+        parser.add_argument(
+            '--defer-constraints',
+            action='store_true',
+            help='Проверять внешние ключи после загрузки всех записей'
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать через COPY (только PostgreSQL)'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        loader = FixtureLoader(
+            batch_size=options['batch_size'],
+            use_copy=options['copy'],
+            ignore_conflicts=options['ignore_conflicts'],
+            exclude=[label.lower() for label in options['exclude']]
+        )
+        try:
+            with transaction.atomic():
+                for name in options['files']:
+                    with open_fixture(name) as file:
+                        loader.load(file, options['defer_constraints'])
+        except (FixtureError, IntegrityError, OSError) as error:
+            raise CommandError(error)
+        for model, total in loader.loaded.items():
+            self.stdout.write(f'{model._meta.label}: загружено {total}')
+        if any(model._meta.app_label in REBUILT_APPS
+               for model in loader.loaded):
+            self.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {sum(loader.loaded.values())}'
+        ))
+
+    def rebuild(self):
+        call_command('recount', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        for namespace in ('tags', USERS_NAMESPACE):
+            bump_version(namespace)
+        ingredient_index.invalidate()
+        feed.publish_all()
+        invalidate_all_preferences()
+        recipe_matcher.invalidate()
+        detail_cache.invalidate_all()
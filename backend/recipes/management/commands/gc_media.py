@@ -0,0 +1,72 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from recipes.images import IMAGES_DIR, THUMBNAILS_DIR, thumbnail_names
+from recipes.models import Recipe
+from recipes.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет медиафайлы рецептов, на которые нет ссылок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=60 * 60,
+            help='Не трогать файлы моложе указанного числа секунд'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        deadline = time.time() - options['grace']
+        dry_run = options['dry_run']
+        files, freed = self.collect_files(deadline, dry_run)
+        freed += self.collect_blobs(deadline, dry_run)
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {files}, освобождено байт: {freed}'
+        ))
+
+    def referenced_names(self):
+        referenced = set()
+        for image, thumbnail in Recipe.objects.values_list(
+            'image', 'thumbnail'
+        ).iterator():
+            referenced.add(image)
+            if thumbnail:
+                referenced.update(thumbnail_names(thumbnail))
+        return referenced
+
+    def collect_files(self, deadline, dry_run):
+        referenced = self.referenced_names()
+        files = freed = 0
+        for directory in (IMAGES_DIR, THUMBNAILS_DIR):
+            root_dir = os.path.join(settings.MEDIA_ROOT, directory)
+            for root, _, file_names in os.walk(root_dir):
+                for file_name in file_names:
+                    path = os.path.join(root, file_name)
+                    name = os.path.relpath(path, settings.MEDIA_ROOT)
+                    stat = os.stat(path)
+                    if name in referenced or stat.st_mtime > deadline:
+                        continue
+                    if not dry_run:
+                        os.unlink(path)
+                    files += 1
+                    if stat.st_nlink == 1:
+                        freed += stat.st_size
+        return files, freed
+
+    def collect_blobs(self, deadline, dry_run):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            return 0
+        freed = 0
+        for path, size in default_storage.orphan_blobs():
+            if os.stat(path).st_mtime > deadline:
+                continue
+            if not dry_run:
+                os.unlink(path)
+            freed += size
+        return freed
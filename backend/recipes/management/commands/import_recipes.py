@@ -0,0 +1,66 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from recipes.bulk import RecipeImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Загружает рецепты из файла NDJSON (по рецепту на строку)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='Файл NDJSON, "-" - читать из стандартного ввода'
+        )
+        parser.add_argument(
+            '--author',
+            help='Email автора для записей без поля author'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--report',
+            help='Файл для отчёта об ошибках в формате JSON'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Проверить файл без записи в базу'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        author = None
+        if options['author']:
+            author = User.objects.filter(email=options['author']).first()
+            if author is None:
+                raise CommandError(
+                    f'Пользователь {options["author"]} не найден'
+                )
+        importer = RecipeImporter(
+            author=author,
+            trust_authors=True,
+            trust_paths=True,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+        if options['file'] == '-':
+            report = importer.run(sys.stdin)
+        else:
+            with open(options['file'], 'r', encoding='utf-8') as file:
+                report = importer.run(file)
+        for error in report['errors']:
+            self.stderr.write(
+                f'Строка {error["line"]}: '
+                f'{json.dumps(error["errors"], ensure_ascii=False)}'
+            )
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        action = 'будет добавлено' if options['dry_run'] else 'добавлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Рецептов {action}: {report["created"]}, '
+            f'с ошибками: {report["failed"]}'
+        ))
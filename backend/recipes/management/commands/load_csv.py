@@ -1,36 +1,102 @@
 import csv
+import json
+import os
+import time
 
-from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from api.cache import bump_version
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from recipes.ingredient_index import ingredient_index
 from recipes.models import Ingredient, Tag
+from recipes.utils import batches
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data'
+)
+INGREDIENT_FIELDS = ('name', 'measurement_unit')
+TAG_FIELDS = ('name', 'color', 'slug')
+
+
+def read_rows(file_name, file_format, fields):
+    with open(file_name, 'r', encoding='utf-8') as file:
+        if file_format == 'json':
+            for row in json.load(file):
+                yield {field: row[field] for field in fields}
+        else:
+            for row in csv.reader(file):
+                if row:
+                    yield dict(zip(fields, row))
 
 
 class Command(BaseCommand):
+    help = 'Загружает ингредиенты и теги в базу данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=os.path.join(DATA_DIR, 'ingredients.csv'),
+            help='Файл с ингредиентами'
+        )
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'json'),
+            help='Формат файла с ингредиентами (по расширению файла)'
+        )
+        parser.add_argument(
+            '--tags-file',
+            default=os.path.join(DATA_DIR, 'tags.csv'),
+            help='CSV-файл с тегами'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Прочитать файлы без записи в базу'
+        )
 
     def handle(self, *args, **options):
-        file_name = 'recipes/data/ingredients.csv'
-        with open(file_name, 'r', encoding='utf-8') as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, measurement_unit = row
-                try:
-                    Ingredient.objects.get_or_create(
-                        name=name,
-                        measurement_unit=measurement_unit
-                    )
-                except IntegrityError:
-                    print(f'Ингредиент {name} {measurement_unit}'
-                          f'уже есть в базе')
-        file_name = 'recipes/data/tags.csv'
-        with open(file_name, 'r', encoding='utf-8') as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, color, slug = row
-                try:
-                    Tag.objects.get_or_create(
-                        name=name,
-                        color=color,
-                        slug=slug
-                    )
-                except IntegrityError:
-                    print(f'Тег {name} уже есть в базе')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        file_format = options['format'] or (
+            'json' if options['file'].endswith('.json') else 'csv'
+        )
+        with transaction.atomic():
+            self.load(
+                Ingredient,
+                read_rows(options['file'], file_format, INGREDIENT_FIELDS),
+                options
+            )
+            self.load(
+                Tag,
+                read_rows(options['tags_file'], 'csv', TAG_FIELDS),
+                options
+            )
+        if not options['dry_run']:
+            ingredient_index.invalidate()
+            bump_version('tags')
+
+    def load(self, model, rows, options):
+        name = model._meta.verbose_name_plural
+        started = time.monotonic()
+        total = created = 0
+        seen = set()
+        for batch in batches(rows, options['batch_size']):
+            names = {row['name'] for row in batch} - seen
+            seen |= names
+            existing = model.objects.filter(name__in=names).count()
+            if not options['dry_run']:
+                model.objects.bulk_create(
+                    [model(**row) for row in batch],
+                    ignore_conflicts=True
+                )
+            total += len(batch)
+            created += len(names) - existing
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{name}: {total} строк '
+                f'({total / elapsed if elapsed else total:.0f} строк/с)'
+            )
+        action = 'будет добавлено' if options['dry_run'] else 'добавлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{name}: {action} {created} из {total}'
+        ))
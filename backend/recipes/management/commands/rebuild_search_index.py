@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes import search
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс рецептов'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = search.rebuild(Recipe.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано рецептов: {total}'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes.counters import recount
+from recipes.models import Favorites, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorites, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Subscription, 'author'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики избранного, покупок, рецептов и подписчиков'
+
+    def handle(self, *args, **options):
+        for model, field, related_model, related_field in COUNTERS:
+            with transaction.atomic():
+                fixed = recount(model, field, related_model, related_field)
+            self.stdout.write(
+                f'{model.__name__}.{field}: исправлено записей - {fixed}'
+            )
@@ -0,0 +1,92 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from recipes.synthetic import SyntheticData, synthetic_users
+
+LABELS = (
+    ('users', 'пользователей'),
+    ('recipes', 'рецептов'),
+    ('ingredients', 'ингредиентов в рецептах'),
+    ('favorites', 'добавлений в избранное'),
+    ('carts', 'добавлений в список покупок'),
+    ('subscriptions', 'подписок'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, рецептами, '
+        'избранным, списками покупок и подписками'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument(
+            '--favorites',
+            type=float,
+            default=20,
+            help='Среднее число рецептов в избранном у пользователя'
+        )
+        parser.add_argument(
+            '--carts',
+            type=float,
+            default=5,
+            help='Среднее число рецептов в списке покупок у пользователя'
+        )
+        parser.add_argument(
+            '--subscriptions',
+            type=float,
+            default=10,
+            help='Среднее число подписок у пользователя'
+        )
+        parser.add_argument(
+            '--ingredients',
+            type=float,
+            default=8,
+            help='Среднее число ингредиентов в рецепте'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для популярности'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить ранее созданные синтетические данные'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        if min(options['users'], options['recipes']) < 0:
+            raise CommandError('Количество записей не может быть меньше нуля')
+        if options['recipes'] and not options['users']:
+            raise CommandError('Для рецептов нужны пользователи')
+        if options['clear']:
+            deleted, _ = synthetic_users().delete()
+            self.stdout.write(f'Удалено записей: {deleted}')
+        generator = SyntheticData(
+            users=options['users'],
+            recipes=options['recipes'],
+            favorites=options['favorites'],
+            carts=options['carts'],
+            subscriptions=options['subscriptions'],
+            ingredients=options['ingredients'],
+            skew=options['skew'],
+            seed=options['seed'],
+            batch_size=options['batch_size']
+        )
+        created = generator.generate()
+        if created is None:
+            raise CommandError(
+                'Нет ингредиентов: сначала выполните load_csv'
+            )
+        call_command('recount', stdout=self.stdout)
+        generator.finalize()
+        for key, label in LABELS:
+            self.stdout.write(f'Создано {label}: {created[key]}')
+        self.stdout.write(self.style.SUCCESS('Готово'))
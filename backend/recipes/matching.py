@@ -0,0 +1,168 @@
+import bisect
+import threading
+from array import array
+from collections import Counter, defaultdict
+from itertools import chain
+
+from api.cache import get_counter, increment_counter
+from django.db import DatabaseError
+
+from .models import IngredientInRecipe, Recipe, TagInRecipe
+from .utils import group_pairs
+
+NAMESPACE = 'recipe_matching'
+
+
+def build_postings(ingredients):
+    postings = defaultdict(list)
+    for recipe_id in sorted(ingredients):
+        for ingredient_id in ingredients[recipe_id]:
+            postings[ingredient_id].append(recipe_id)
+    return {
+        ingredient_id: array('I', recipe_ids)
+        for ingredient_id, recipe_ids in postings.items()
+    }
+
+
+def without(recipe_ids, recipe_id):
+    index = bisect.bisect_left(recipe_ids, recipe_id)
+    if index < len(recipe_ids) and recipe_ids[index] == recipe_id:
+        return recipe_ids[:index] + recipe_ids[index + 1:]
+    return recipe_ids
+
+
+def with_recipe(recipe_ids, recipe_id):
+    index = bisect.bisect_left(recipe_ids, recipe_id)
+    if index < len(recipe_ids) and recipe_ids[index] == recipe_id:
+        return recipe_ids
+    return recipe_ids[:index] + array('I', (recipe_id,)) + recipe_ids[index:]
+
+
+class RecipeMatcher:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._ingredients = {}
+        self._tags = {}
+        self._cooking_times = {}
+        self._version = None
+
+    def warm_up(self):
+        try:
+            self._ensure_fresh()
+        except DatabaseError:
+            pass
+
+    def load(self, recipe_ids=None):
+        recipes = Recipe.objects.order_by()
+        ingredients = IngredientInRecipe.objects.order_by()
+        tags = TagInRecipe.objects.order_by()
+        if recipe_ids is not None:
+            recipes = recipes.filter(pk__in=recipe_ids)
+            ingredients = ingredients.filter(recipe_id__in=recipe_ids)
+            tags = tags.filter(recipe_id__in=recipe_ids)
+        cooking_times = dict(
+            recipes.values_list('id', 'cooking_time').iterator()
+        )
+        ingredients = group_pairs(
+            ingredients.values_list('recipe_id', 'ingredient_id').iterator()
+        )
+        tags = group_pairs(tags.values_list('recipe_id', 'tag_id').iterator())
+        return cooking_times, {
+            recipe_id: frozenset(ingredients.get(recipe_id, ()))
+            for recipe_id in cooking_times
+        }, {
+            recipe_id: frozenset(tags.get(recipe_id, ()))
+            for recipe_id in cooking_times
+        }
+
+    def rebuild(self, version=None):
+        if version is None:
+            version = get_counter(NAMESPACE)
+        cooking_times, ingredients, tags = self.load()
+        postings = build_postings(ingredients)
+        with self._lock:
+            self._postings = postings
+            self._ingredients, self._tags = ingredients, tags
+            self._cooking_times = cooking_times
+            self._version = version
+
+    def update(self, recipe_ids):
+        recipe_ids = set(recipe_ids)
+        cooking_times, ingredients, tags = self.load(recipe_ids)
+        version = increment_counter(NAMESPACE)
+        with self._lock:
+            if self._version != version - 1:
+                self._version = None
+                return
+            self._replace(recipe_ids, cooking_times, ingredients, tags)
+            self._version = version
+
+    def invalidate(self):
+        increment_counter(NAMESPACE)
+
+    def _replace(self, recipe_ids, cooking_times, ingredients, tags):
+        postings = self._postings
+        previous = {
+            recipe_id: self._ingredients.get(recipe_id, frozenset())
+            for recipe_id in recipe_ids
+        }
+        self._ingredients.update(ingredients)
+        self._tags.update(tags)
+        self._cooking_times.update(cooking_times)
+        for recipe_id in recipe_ids:
+            current = ingredients.get(recipe_id, frozenset())
+            for ingredient_id in previous[recipe_id] - current:
+                remaining = without(
+                    postings.get(ingredient_id, array('I')), recipe_id
+                )
+                if remaining:
+                    postings[ingredient_id] = remaining
+                else:
+                    postings.pop(ingredient_id, None)
+            for ingredient_id in current - previous[recipe_id]:
+                postings[ingredient_id] = with_recipe(
+                    postings.get(ingredient_id, array('I')), recipe_id
+                )
+        for recipe_id in recipe_ids - cooking_times.keys():
+            for mapping in (self._ingredients, self._tags,
+                            self._cooking_times):
+                mapping.pop(recipe_id, None)
+
+    def match(self, ingredient_ids, tag_ids=None, max_cooking_time=None,
+              max_missing=None):
+        self._ensure_fresh()
+        postings, ingredients = self._postings, self._ingredients
+        tags, cooking_times = self._tags, self._cooking_times
+        matched = Counter(chain.from_iterable(
+            postings.get(ingredient_id, ())
+            for ingredient_id in set(ingredient_ids)
+        ))
+        results = []
+        for recipe_id, count in matched.items():
+            recipe_ingredients = ingredients.get(recipe_id)
+            if recipe_ingredients is None:
+                continue
+            missing = len(recipe_ingredients) - count
+            if max_missing is not None and missing > max_missing:
+                continue
+            if (max_cooking_time is not None
+                    and cooking_times[recipe_id] > max_cooking_time):
+                continue
+            if tag_ids is not None and tags[recipe_id].isdisjoint(tag_ids):
+                continue
+            results.append((missing, -count, -recipe_id))
+        results.sort()
+        return [
+            (-recipe_id, -count, missing)
+            for missing, count, recipe_id in results
+        ]
+
+    def _ensure_fresh(self):
+        version = get_counter(NAMESPACE)
+        if version != self._version:
+            self.rebuild(version)
+
+
+recipe_matcher = RecipeMatcher()
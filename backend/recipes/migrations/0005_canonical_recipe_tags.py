@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_copy_recipe_tags'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taginrecipe',
+            name='tag',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_recipe', to='recipes.Tag', verbose_name='Тег'),
+        ),
+        migrations.AddConstraint(
+            model_name='taginrecipe',
+            constraint=models.UniqueConstraint(fields=('recipe', 'tag'), name='unique_tag_in_recipe'),
+        ),
+        migrations.AddIndex(
+            model_name='taginrecipe',
+            index=models.Index(fields=['tag', 'recipe'], name='tag_in_recipe_tag_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='recipe',
+            name='tags',
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tags',
+            field=models.ManyToManyField(help_text='Укажите теги', through='recipes.TagInRecipe', to='recipes.Tag', verbose_name='Теги'),
+        ),
+    ]
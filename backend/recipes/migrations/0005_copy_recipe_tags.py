@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+def move_tags_to_tag_in_recipe(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    TagInRecipe = apps.get_model('recipes', 'TagInRecipe')
+    seen = set()
+    duplicates = []
+    for pk, recipe_id, tag_id in TagInRecipe.objects.order_by('id').values_list(
+        'id', 'recipe_id', 'tag_id'
+    ):
+        if (recipe_id, tag_id) in seen:
+            duplicates.append(pk)
+        seen.add((recipe_id, tag_id))
+    TagInRecipe.objects.filter(id__in=duplicates).delete()
+    TagInRecipe.objects.bulk_create(
+        TagInRecipe(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id, tag_id in set(
+            Recipe.tags.through.objects.values_list('recipe_id', 'tag_id')
+        ) - seen
+    )
+
+
+def move_tags_to_auto_table(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    TagInRecipe = apps.get_model('recipes', 'TagInRecipe')
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id, tag_id in TagInRecipe.objects.values_list(
+            'recipe_id', 'tag_id'
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            move_tags_to_tag_in_recipe,
+            move_tags_to_auto_table
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+POSTGRES_VECTOR = ' || '.join(
+    f"setweight(to_tsvector('{config}', coalesce({column}, '')), "
+    f"'{weight}')"
+    for column, weight in (
+        ('recipe.name', 'A'), ('ingredients.names', 'B'), ('recipe.text', 'C')
+    )
+    for config in ('russian', 'english')
+)
+POSTGRES_INSTALL = (
+    'ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector',
+    f'UPDATE recipes_recipe recipe SET search_vector = {POSTGRES_VECTOR} '
+    "FROM (SELECT source.id, string_agg(ingredient.name, ' ') AS names "
+    'FROM recipes_recipe source '
+    'LEFT JOIN recipes_ingredientinrecipe link ON link.recipe_id = source.id '
+    'LEFT JOIN recipes_ingredient ingredient '
+    'ON ingredient.id = link.ingredient_id '
+    'GROUP BY source.id) ingredients '
+    'WHERE recipe.id = ingredients.id',
+    'CREATE INDEX recipe_search_vector_idx ON recipes_recipe '
+    'USING gin (search_vector)',
+)
+POSTGRES_UNINSTALL = (
+    'ALTER TABLE recipes_recipe DROP COLUMN search_vector',
+)
+SQLITE_INSTALL = (
+    'CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5('
+    "name, ingredients, text, tokenize = 'unicode61 remove_diacritics 2')",
+    'INSERT INTO recipes_recipe_fts (rowid, name, ingredients, text) '
+    'SELECT recipe.id, recipe.name, coalesce(('
+    "SELECT group_concat(ingredient.name, ' ') "
+    'FROM recipes_ingredientinrecipe link JOIN recipes_ingredient ingredient '
+    'ON ingredient.id = link.ingredient_id WHERE link.recipe_id = recipe.id'
+    "), ''), recipe.text FROM recipes_recipe recipe",
+)
+SQLITE_UNINSTALL = (
+    'DROP TABLE recipes_recipe_fts',
+)
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({
+                'postgresql': POSTGRES_INSTALL,
+                'sqlite': SQLITE_INSTALL,
+            }),
+            run_for_vendor({
+                'postgresql': POSTGRES_UNINSTALL,
+                'sqlite': SQLITE_UNINSTALL,
+            }),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Syncs Tag.color with the model: the colour samples were dropped from the
+# field and the verbose name typo fixed without a migration.
+
+import colorfield.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='color',
+            field=colorfield.fields.ColorField(default='#FFFFFF', help_text='Выберите тег', image_field=None, max_length=7, samples=None, verbose_name='hex цвета тега'),
+        ),
+    ]
@@ -2,6 +2,9 @@ from colorfield.fields import ColorField
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Prefetch, Value, Window
+from django.db.models.functions import RowNumber
+from users.models import Subscription
 
 User = get_user_model()
 
@@ -54,12 +57,60 @@ class Ingredient(models.Model):
         return f'{self.name} {self.measurement_unit}'
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_related(self):
+        return self.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'ingredient_recipe',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredient'
+                )
+            ),
+        )
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                author_is_subscribed=Value(False, models.BooleanField())
+            )
+        return self.annotate(
+            author_is_subscribed=Exists(Subscription.objects.filter(
+                user=user, author=OuterRef('author')
+            ))
+        )
+
+    def latest_per_author(self, author_ids, limit=None):
+        queryset = self.filter(author_id__in=author_ids).only(
+            'id', 'name', 'image', 'thumbnail', 'cooking_time', 'author_id'
+        )
+        if limit is None or not author_ids:
+            return queryset
+        ranked = queryset.order_by().annotate(recipe_rank=Window(
+            expression=RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=[F('pub_date').desc(), F('id').desc()],
+        )).values(
+            'id', 'name', 'image', 'thumbnail', 'cooking_time', 'author_id',
+            'recipe_rank'
+        )
+        sql, params = ranked.query.sql_with_params()
+        return self.raw(
+            'SELECT id, name, image, thumbnail, cooking_time, author_id '
+            f'FROM ({sql}) ranked WHERE recipe_rank <= %s '
+            'ORDER BY author_id, recipe_rank',
+            (*params, limit)
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
         verbose_name='Автор',
         on_delete=models.CASCADE,
         related_name='recipes',
+        db_index=False
     )
     name = models.CharField(
         verbose_name='Название рецепта',
@@ -70,6 +121,12 @@ class Recipe(models.Model):
         verbose_name='Картинка',
         upload_to='recipes/images/',
     )
+    thumbnail = models.CharField(
+        verbose_name='Превью',
+        max_length=255,
+        blank=True,
+        editable=False
+    )
     text = models.TextField(
         verbose_name='Описание рецепта',
         help_text='Опишите процесс приготовления рецепта'
@@ -84,6 +141,7 @@ class Recipe(models.Model):
         Tag,
         verbose_name='Теги',
         help_text='Укажите теги',
+        through='TagInRecipe',
     )
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
@@ -97,11 +155,40 @@ class Recipe(models.Model):
                 1, message='Минимальное время приготовления - 1 минута!'),
         )
     )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='Добавлений в избранное',
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    in_carts_count = models.PositiveIntegerField(
+        verbose_name='Добавлений в список покупок',
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    version = models.PositiveIntegerField(
+        verbose_name='Версия',
+        default=0,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-pub_date', )
+        ordering = ('-pub_date', '-id')
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='recipe_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -116,7 +203,7 @@ class TagInRecipe(models.Model):
     )
     tag = models.ForeignKey(
         Tag,
-        verbose_name='Ингредиент',
+        verbose_name='Тег',
         on_delete=models.CASCADE,
         related_name='tag_recipe'
     )
@@ -124,6 +211,18 @@ class TagInRecipe(models.Model):
     class Meta:
         verbose_name = 'Тег рецепта'
         verbose_name_plural = 'Теги рецептов'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('recipe', 'tag'),
+                name='unique_tag_in_recipe'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('tag', 'recipe'),
+                name='tag_in_recipe_tag_idx'
+            ),
+        )
 
     def __str__(self):
         return f'{self.tag.name} для рецепта {self.recipe.name}'
@@ -214,3 +313,50 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user} положил в корзину {self.recipe}'
+
+
+class FeedItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+        db_index=False
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+        related_name='feed_items'
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='unique_feed_item'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-recipe'),
+                name='feed_item_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=('user', 'author'),
+                name='feed_item_user_author_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipe} в ленте {self.user}'
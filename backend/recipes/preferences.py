@@ -0,0 +1,79 @@
+from array import array
+
+from api.cache import bump_version, get_version
+from django.conf import settings
+from django.core.cache import cache
+from users.models import Subscription
+
+from .models import Favorites, ShoppingCart
+
+CACHE_KEY = 'preferences:{user_id}'
+VERSION_NAMESPACE = 'preferences:{user_id}'
+REQUEST_ATTR = '_user_preferences'
+
+
+class UserPreferences:
+
+    def __init__(self, favorites=(), shopping_cart=()):
+        self.favorites = frozenset(favorites)
+        self.shopping_cart = frozenset(shopping_cart)
+
+    def is_favorited(self, recipe_id):
+        return recipe_id in self.favorites
+
+    def is_in_shopping_cart(self, recipe_id):
+        return recipe_id in self.shopping_cart
+
+
+def recipe_ids(model, user_id):
+    return array('I', sorted(
+        model.objects.filter(user_id=user_id).values_list(
+            'recipe_id', flat=True
+        )
+    ))
+
+
+def load_preferences(user_id):
+    key = CACHE_KEY.format(user_id=user_id)
+    data = cache.get(key)
+    if data is None:
+        data = (
+            recipe_ids(Favorites, user_id),
+            recipe_ids(ShoppingCart, user_id),
+        )
+        cache.set(key, data, settings.API_CACHE_TIMEOUT)
+    return UserPreferences(*data)
+
+
+def get_preferences(request):
+    if request is None or request.user.is_anonymous:
+        return UserPreferences()
+    preferences = getattr(request, REQUEST_ATTR, None)
+    if preferences is None:
+        preferences = load_preferences(request.user.pk)
+        setattr(request, REQUEST_ATTR, preferences)
+    return preferences
+
+
+def preferences_version(user):
+    if user.is_anonymous:
+        return None
+    return get_version(VERSION_NAMESPACE.format(user_id=user.pk))
+
+
+def bump_preferences_version(user_id):
+    bump_version(VERSION_NAMESPACE.format(user_id=user_id))
+
+
+def invalidate_preferences(user_id):
+    cache.delete(CACHE_KEY.format(user_id=user_id))
+    bump_preferences_version(user_id)
+
+
+def invalidate_all_preferences():
+    user_ids = Favorites.objects.values_list('user_id', flat=True).union(
+        ShoppingCart.objects.values_list('user_id', flat=True),
+        Subscription.objects.values_list('user_id', flat=True)
+    )
+    for user_id in user_ids.iterator():
+        invalidate_preferences(user_id)
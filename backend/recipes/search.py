@@ -0,0 +1,124 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .utils import batches
+
+FTS_TABLE = 'recipes_recipe_fts'
+SEARCH_CONFIGS = ('russian', 'english')
+SEARCH_WEIGHTS = (('recipe.name', 'A'), ('ingredients.names', 'B'),
+                  ('recipe.text', 'C'))
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+UPDATE_BATCH_SIZE = 500
+WORD_RE = re.compile(r'\w+')
+
+POSTGRES_VECTOR_SQL = ' || '.join(
+    f"setweight(to_tsvector('{config}', coalesce({column}, '')), "
+    f"'{weight}')"
+    for column, weight in SEARCH_WEIGHTS for config in SEARCH_CONFIGS
+)
+POSTGRES_UPDATE_SQL = (
+    f'UPDATE recipes_recipe recipe SET search_vector = {POSTGRES_VECTOR_SQL} '
+    "FROM (SELECT source.id, string_agg(ingredient.name, ' ') AS names "
+    'FROM recipes_recipe source '
+    'LEFT JOIN recipes_ingredientinrecipe link ON link.recipe_id = source.id '
+    'LEFT JOIN recipes_ingredient ingredient '
+    'ON ingredient.id = link.ingredient_id '
+    'WHERE source.id = ANY(%s) GROUP BY source.id) ingredients '
+    'WHERE recipe.id = ingredients.id'
+)
+POSTGRES_QUERY_SQL = ' || '.join(
+    f"plainto_tsquery('{config}', %s)" for config in SEARCH_CONFIGS
+)
+SQLITE_INSERT_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, name, ingredients, text) '
+    'SELECT recipe.id, recipe.name, coalesce(('
+    "SELECT group_concat(ingredient.name, ' ') "
+    'FROM recipes_ingredientinrecipe link JOIN recipes_ingredient ingredient '
+    'ON ingredient.id = link.ingredient_id WHERE link.recipe_id = recipe.id'
+    "), ''), recipe.text FROM recipes_recipe recipe "
+    'WHERE recipe.id IN ({placeholders})'
+)
+
+
+def placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def update(recipe_ids):
+    for ids in batches(set(recipe_ids), UPDATE_BATCH_SIZE):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(POSTGRES_UPDATE_SQL, (ids,))
+            elif connection.vendor == 'sqlite':
+                remove(ids)
+                cursor.execute(
+                    SQLITE_INSERT_SQL.format(placeholders=placeholders(ids)),
+                    ids
+                )
+
+
+def remove(recipe_ids):
+    if connection.vendor != 'sqlite' or not recipe_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} '
+            f'WHERE rowid IN ({placeholders(recipe_ids)})',
+            list(recipe_ids)
+        )
+
+
+def rebuild(queryset):
+    total = 0
+    for ids in batches(
+        queryset.values_list('pk', flat=True).iterator(), UPDATE_BATCH_SIZE
+    ):
+        update(ids)
+        total += len(ids)
+    return total
+
+
+def fts_query(value):
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(value))
+
+
+def search(queryset, value):
+    if connection.vendor == 'postgresql':
+        params = [value] * len(SEARCH_CONFIGS)
+        condition = (
+            f'recipes_recipe.search_vector @@ ({POSTGRES_QUERY_SQL})',
+            params
+        )
+        rank = RawSQL(
+            'ts_rank_cd(recipes_recipe.search_vector, '
+            f'{POSTGRES_QUERY_SQL})',
+            params,
+            output_field=FloatField()
+        )
+    elif connection.vendor == 'sqlite':
+        query = fts_query(value)
+        if not query:
+            return queryset.none()
+        condition = (
+            f'recipes_recipe.id IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)',
+            (query,)
+        )
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {placeholders(FTS_WEIGHTS)}) '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            'AND rowid = recipes_recipe.id',
+            (*FTS_WEIGHTS, query),
+            output_field=FloatField()
+        )
+    else:
+        return queryset.filter(
+            Q(name__icontains=value) | Q(text__icontains=value)
+        ).annotate(search_rank=Value(0.0, FloatField()))
+    where, params = condition
+    return queryset.extra(where=(where,), params=params).annotate(
+        search_rank=rank
+    ).order_by('-search_rank', '-pub_date', '-id')
@@ -1,16 +1,47 @@
+from collections import Counter
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from users.models import Subscription
 from users.serializers import CustomUserSerializer
 
+from . import feed
+from .images import (IMAGES_DIR, release_files, schedule_processing,
+                     thumbnail_name)
 from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
                      ShoppingCart, Tag)
+from .preferences import get_preferences
+from .signals import send_recipes_updated
 
 User = get_user_model()
 
 
+class ThumbnailField(serializers.ReadOnlyField):
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        if recipe.thumbnail:
+            name = thumbnail_name(recipe.thumbnail, self.size)
+        elif recipe.image:
+            name = recipe.image.name
+        else:
+            return None
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
@@ -23,24 +54,31 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit')
 
 
+def id_errors(label, ids, found):
+    return [
+        f'{label} {pk} указан несколько раз!'
+        for pk, count in Counter(ids).items() if count > 1
+    ] + [
+        f'{label} {pk} не найден!'
+        for pk in dict.fromkeys(ids) if pk not in found
+    ]
+
+
 class IngredientInRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.ReadOnlyField(source='ingredient.id')
     name = serializers.ReadOnlyField(source='ingredient.name')
     measurement_unit = serializers.ReadOnlyField(
         source='ingredient.measurement_unit'
     )
-    amount = serializers.IntegerField()
 
     class Meta:
         model = IngredientInRecipe
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
-    def validate_amount(self, value):
-        if int(value) < 1:
-            raise serializers.ValidationError(
-                'Количество ингредиента должно быть больше нуля!'
-            )
-        return value
+
+class IngredientAmountSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    amount = serializers.IntegerField()
 
 
 class FavoritesSerializer(serializers.ModelSerializer):
@@ -66,6 +104,8 @@ class FavoritesSerializer(serializers.ModelSerializer):
 
 
 class FavoritePreviewSerializer(serializers.ModelSerializer):
+    image = ThumbnailField(settings.RECIPE_PREVIEW_THUMBNAIL_SIZE)
+
     class Meta:
         model = Recipe
         fields = ('id', 'name', 'image', 'cooking_time')
@@ -102,30 +142,57 @@ class RecipeViewSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
+
     def get_ingredients(self, obj):
-        ingredients = IngredientInRecipe.objects.filter(recipe=obj)
-        return IngredientInRecipeSerializer(ingredients, many=True).data
+        return IngredientInRecipeSerializer(
+            obj.ingredient_recipe.all(),
+            many=True
+        ).data
 
     def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if not request or request.user.is_anonymous:
-            return False
-        return request.user.favorite_user.filter(recipe=obj).exists()
+        preferences = get_preferences(self.context.get('request'))
+        return preferences.is_favorited(obj.pk)
 
     def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if not request or request.user.is_anonymous:
-            return False
-        return request.user.shopping_cart_user.filter(recipe=obj).exists()
+        preferences = get_preferences(self.context.get('request'))
+        return preferences.is_in_shopping_cart(obj.pk)
 
 
-class RecipeCreateSerializer(serializers.ModelSerializer):
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(),
-        many=True
+class RecipeListSerializer(RecipeViewSerializer):
+    image = ThumbnailField(settings.RECIPE_LIST_THUMBNAIL_SIZE)
+
+
+class RecipeMatchSerializer(RecipeListSerializer):
+    matched_ingredients = serializers.ReadOnlyField()
+    missing_ingredients = serializers.ReadOnlyField()
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + (
+            'matched_ingredients', 'missing_ingredients'
+        )
+
+
+class CookQuerySerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False
+    )
+    tags = serializers.ListField(
+        child=serializers.SlugField(),
+        required=False
     )
+    max_cooking_time = serializers.IntegerField(min_value=1, required=False)
+    max_missing = serializers.IntegerField(min_value=0, required=False)
+
+
+class RecipeCreateSerializer(serializers.ModelSerializer):
+    tags = serializers.ListField(child=serializers.IntegerField())
     image = Base64ImageField()
-    ingredients = IngredientInRecipeSerializer(many=True)
+    ingredients = IngredientAmountSerializer(many=True)
     author = CustomUserSerializer(read_only=True)
 
     class Meta:
@@ -142,37 +209,47 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        ingredients_list = []
-        for ingredient in ingredients:
-            ingredient_id = ingredient['id']
-            if ingredient_id in ingredients_list:
-                raise serializers.ValidationError(
-                    'Ингредиенты должны быть уникальными!'
-                )
-            ingredients_list.append(ingredient_id)
-            amount = ingredient['amount']
-            if int(amount) <= 0:
-                raise serializers.ValidationError(
-                    'Количество ингредиента должно быть больше нуля!'
-                )
-        tags = self.initial_data.get('tags')
-        if not tags:
-            raise serializers.ValidationError('Выберите хотя бы один тег!')
-        tags_list = []
-        for tag in tags:
-            if tag in tags_list:
-                raise serializers.ValidationError(
-                    'Теги должны быть уникальными!'
-                )
-            tags_list.append(tag)
-        cooking_time = self.initial_data.get('cooking_time')
-        if int(cooking_time) <= 0:
-            raise serializers.ValidationError(
-                'Время приготовления не может быть меньше 1 мин.'
+        errors = {}
+        if 'ingredients' in data:
+            data['ingredients'] = self.resolve_ingredients(
+                data['ingredients'], errors
             )
+        if 'tags' in data or not self.partial:
+            data['tags'] = self.resolve_tags(data.get('tags'), errors)
+        if errors:
+            raise serializers.ValidationError(errors)
         return data
 
+    def resolve_ingredients(self, ingredients, errors):
+        ids = [ingredient['id'] for ingredient in ingredients]
+        found = Ingredient.objects.in_bulk(set(ids))
+        messages = id_errors('Ингредиент', ids, found) + [
+            f'Количество ингредиента {ingredient["id"]} '
+            'должно быть больше нуля!'
+            for ingredient in ingredients if ingredient['amount'] < 1
+        ]
+        if messages:
+            errors['ingredients'] = messages
+            return None
+        return [
+            {
+                'ingredient': found[ingredient['id']],
+                'amount': ingredient['amount'],
+            }
+            for ingredient in ingredients
+        ]
+
+    def resolve_tags(self, tags, errors):
+        if not tags:
+            errors['tags'] = ['Выберите хотя бы один тег!']
+            return None
+        found = Tag.objects.in_bulk(set(tags))
+        messages = id_errors('Тег', tags, found)
+        if messages:
+            errors['tags'] = messages
+            return None
+        return [found[tag_id] for tag_id in tags]
+
     def create(self, validated_data):
         request = self.context.get('request')
         ingredients = validated_data.pop('ingredients', None)
@@ -184,46 +261,124 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 IngredientInRecipe(
                     recipe=recipe,
                     amount=ingredient['amount'],
-                    ingredient=ingredient['id'],
+                    ingredient=ingredient['ingredient'],
                 )
                 for ingredient in ingredients
             ]
         )
+        schedule_processing(recipe)
+        send_recipes_updated((recipe.pk,))
+        feed.publish((recipe,))
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients = validated_data.pop('ingredients')
-        tags = validated_data.pop('tags')
+        locked = Recipe.objects.select_for_update().only(
+            'image', 'thumbnail'
+        ).get(pk=instance.pk)
+        instance.image = locked.image.name
+        instance.thumbnail = locked.thumbnail
+        ingredients = validated_data.pop('ingredients', None)
+        tags = validated_data.pop('tags', None)
+        update_fields = ['name', 'text', 'cooking_time']
         instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
-        instance.image = validated_data.get('image', instance.image)
+        if 'image' in validated_data:
+            release_files(instance.image.name, instance.thumbnail)
+            instance.image = validated_data['image']
+            instance.thumbnail = ''
+            update_fields += ['image', 'thumbnail']
         instance.cooking_time = validated_data.get(
             'cooking_time',
             instance.cooking_time
         )
-        IngredientInRecipe.objects.filter(recipe=instance).delete()
-        IngredientInRecipe.objects.bulk_create(
-            [
-                IngredientInRecipe(
-                    recipe=instance,
-                    amount=ingredient['amount'],
-                    ingredient=ingredient['id'],
-                )
-                for ingredient in ingredients
-            ]
-        )
+        if ingredients is not None:
+            self.update_ingredients(instance, ingredients)
         if tags:
             instance.tags.set(tags)
-        instance.save()
+        instance.save(update_fields=update_fields)
+        if 'image' in validated_data:
+            schedule_processing(instance)
+        send_recipes_updated((instance.pk,))
         return instance
 
+    def update_ingredients(self, instance, ingredients):
+        current = {
+            item.ingredient_id: item
+            for item in IngredientInRecipe.objects.filter(recipe=instance)
+        }
+        amounts = {
+            ingredient['ingredient'].pk: ingredient['amount']
+            for ingredient in ingredients
+        }
+        changed = []
+        for ingredient_id, amount in amounts.items():
+            item = current.get(ingredient_id)
+            if item is not None and item.amount != amount:
+                item.amount = amount
+                changed.append(item)
+        removed = current.keys() - amounts.keys()
+        if removed:
+            IngredientInRecipe.objects.filter(
+                recipe=instance,
+                ingredient_id__in=removed
+            ).delete()
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ('amount',))
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(
+                recipe=instance,
+                ingredient_id=ingredient_id,
+                amount=amounts[ingredient_id]
+            )
+            for ingredient_id in amounts.keys() - current.keys()
+        )
+
     def to_representation(self, instance):
+        request = self.context.get('request')
+        instance = Recipe.objects.with_related().with_user_flags(
+            request.user
+        ).get(pk=instance.pk)
         return RecipeViewSerializer(
             instance,
-            context={'request': self.context.get('request')}
+            context={'request': request}
         ).data
 
 
+class ImportImageField(Base64ImageField):
+    def to_internal_value(self, data):
+        if isinstance(data, str) and data.startswith(f'{IMAGES_DIR}/'):
+            if not self.context.get('trust_paths'):
+                raise serializers.ValidationError(
+                    'Передайте изображение в формате base64!'
+                )
+            if '..' in data or not default_storage.exists(data):
+                raise serializers.ValidationError(
+                    f'Файл {data} не найден!'
+                )
+            return data
+        return super().to_internal_value(data)
+
+
+class IngredientRecordSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=200)
+    measurement_unit = serializers.CharField(max_length=200, required=False)
+    amount = serializers.IntegerField(min_value=1)
+
+
+class RecipeRecordSerializer(serializers.Serializer):
+    author = serializers.EmailField(required=False)
+    name = serializers.CharField(max_length=200)
+    text = serializers.CharField()
+    cooking_time = serializers.IntegerField(min_value=1, max_value=32767)
+    image = ImportImageField()
+    tags = serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False
+    )
+    ingredients = IngredientRecordSerializer(many=True, allow_empty=False)
+
+
 class FollowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subscription
@@ -243,23 +398,19 @@ class FollowSerializer(serializers.ModelSerializer):
 
 
 class FollowRecipeSerializer(serializers.ModelSerializer):
+    image = ThumbnailField(settings.RECIPE_PREVIEW_THUMBNAIL_SIZE)
+
     class Meta:
         model = Recipe
         fields = ('id', 'name', 'image', 'cooking_time')
         ordering = ('id',)
 
-    def to_representation(self, instance):
-        return RecipeViewSerializer(instance).data
-
 
 class SubscriptionSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(
         source='get_is_subscribed'
     )
     recipes = serializers.SerializerMethodField(source='get_recipes')
-    recipes_count = serializers.SerializerMethodField(
-        source='get_recipes_count'
-    )
 
     class Meta:
         model = User
@@ -275,6 +426,8 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
@@ -287,15 +440,14 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             recipes_limit = request.query_params.get('recipes_limit')
         else:
             return False
-        if recipes_limit is not None:
+        if 'recipes' in self.context:
+            recipes = self.context['recipes'].get(obj.id, ())
+        elif recipes_limit is not None:
             recipes = obj.recipes.all()[:int(recipes_limit)]
         else:
             recipes = obj.recipes.all()
         return FollowRecipeSerializer(recipes, many=True, context=context).data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
 
 class ShoppingCartSerializer(serializers.ModelSerializer):
     class Meta:
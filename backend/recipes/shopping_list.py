@@ -0,0 +1,63 @@
+import csv
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.template.loader import render_to_string
+
+from .models import IngredientInRecipe
+
+PDF_CACHE_KEY = 'shopping_list_pdf:{user_id}'
+PDF_CACHE_TIMEOUT = 60 * 60 * 24
+CSV_HEADER = ('Ингредиент', 'Количество', 'Единица измерения')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def get_shopping_list(user):
+    return IngredientInRecipe.objects.filter(
+        recipe__shopping_cart_recipe__user=user
+    ).values_list(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).order_by(
+        'ingredient__name'
+    ).annotate(
+        ingredient_total=Sum('amount')
+    )
+
+
+def iter_txt(shopping_list):
+    yield 'Cписок покупок: \n'
+    for name, measurement_unit, amount in shopping_list.iterator():
+        yield f'{name}: {amount} {measurement_unit}\n'
+
+
+def iter_csv(shopping_list):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for name, measurement_unit, amount in shopping_list.iterator():
+        yield writer.writerow((name, amount, measurement_unit))
+
+
+def render_pdf(user):
+    ingredients = list(get_shopping_list(user))
+    digest = hashlib.sha1(repr(ingredients).encode()).hexdigest()
+    key = PDF_CACHE_KEY.format(user_id=user.id)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    from weasyprint import HTML
+    html = render_to_string(
+        'recipes/shopping_list.html',
+        {'ingredients': ingredients}
+    )
+    pdf = HTML(string=html).write_pdf()
+    cache.set(key, (digest, pdf), PDF_CACHE_TIMEOUT)
+    return pdf
+
+
+def invalidate_pdf(user_id):
+    cache.delete(PDF_CACHE_KEY.format(user_id=user_id))
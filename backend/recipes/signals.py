@@ -0,0 +1,135 @@
+from api.cache import bump_version
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from users.models import Subscription, User
+
+from . import detail_cache, feed, search
+from .counters import decrement, increment
+from .images import release_files
+from .ingredient_index import ingredient_index
+from .matching import recipe_matcher
+from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingCart, Tag, TagInRecipe)
+from .preferences import invalidate_preferences
+from .shopping_list import invalidate_pdf
+from .utils import batches
+
+recipes_updated = Signal(providing_args=('recipe_ids',))
+VERSION_BATCH_SIZE = 500
+
+COUNTERS = {
+    Recipe: (User, 'author_id', 'recipes_count'),
+    Favorites: (Recipe, 'recipe_id', 'favorites_count'),
+    ShoppingCart: (Recipe, 'recipe_id', 'in_carts_count'),
+}
+
+
+def send_recipes_updated(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    transaction.on_commit(lambda: recipes_updated.send(
+        sender=Recipe, recipe_ids=recipe_ids
+    ))
+
+
+@receiver(recipes_updated)
+def bump_recipe_versions(sender, recipe_ids, **kwargs):
+    for ids in batches(recipe_ids, VERSION_BATCH_SIZE):
+        Recipe.objects.filter(pk__in=ids).update(version=F('version') + 1)
+
+
+@receiver(recipes_updated)
+def reindex_recipes(sender, recipe_ids, **kwargs):
+    search.update(recipe_ids)
+    recipe_matcher.update(recipe_ids)
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def shopping_cart_changed(sender, instance, **kwargs):
+    invalidate_pdf(instance.user_id)
+
+
+@receiver((post_save, post_delete), sender=Favorites)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def preferences_changed(sender, instance, **kwargs):
+    invalidate_preferences(instance.user_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Favorites)
+@receiver(post_save, sender=ShoppingCart)
+def counted_object_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        model, attname, field = COUNTERS[sender]
+        increment(model, getattr(instance, attname), field)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Favorites)
+@receiver(post_delete, sender=ShoppingCart)
+def counted_object_deleted(sender, instance, **kwargs):
+    model, attname, field = COUNTERS[sender]
+    decrement(model, getattr(instance, attname), field)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version('tags')
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        send_recipes_updated(TagInRecipe.objects.filter(
+            tag=instance
+        ).values_list('recipe_id', flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleting(sender, instance, **kwargs):
+    send_recipes_updated(TagInRecipe.objects.filter(
+        tag=instance
+    ).values_list('recipe_id', flat=True))
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, raw=False, **kwargs):
+    transaction.on_commit(lambda: ingredient_index.update(instance))
+    if not created and not raw:
+        send_recipes_updated(IngredientInRecipe.objects.filter(
+            ingredient=instance
+        ).values_list('recipe_id', flat=True))
+
+
+@receiver(pre_delete, sender=Ingredient)
+def ingredient_deleting(sender, instance, **kwargs):
+    send_recipes_updated(IngredientInRecipe.objects.filter(
+        ingredient=instance
+    ).values_list('recipe_id', flat=True))
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: ingredient_index.remove(pk))
+    transaction.on_commit(recipe_matcher.invalidate)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    release_files(instance.image.name, instance.thumbnail)
+    search.remove((instance.pk,))
+    detail_cache.invalidate(instance.pk)
+    transaction.on_commit(lambda: recipe_matcher.update((instance.pk,)))
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        feed.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    feed.retract(instance.user_id, instance.author_id)
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+BLOBS_DIR = '.blobs'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def blob_path(self, digest):
+        return self.path(os.path.join(BLOBS_DIR, digest[:2], digest))
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        blob = self._store_blob(content)
+        while True:
+            try:
+                os.link(blob, full_path)
+            except FileExistsError:
+                name = self.get_available_name(name)
+                full_path = self.path(name)
+            except FileNotFoundError:
+                # The blob was collected between storing and linking it.
+                blob = self._store_blob(content)
+            else:
+                break
+        return name.replace('\\', '/')
+
+    def _store_blob(self, content):
+        blobs_dir = self.path(BLOBS_DIR)
+        os.makedirs(blobs_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=blobs_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            blob = self.blob_path(digest.hexdigest())
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                os.link(temp_path, blob)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(temp_path)
+        return blob
+
+    def references(self, name):
+        return os.stat(self.path(name)).st_nlink - 1
+
+    def orphan_blobs(self):
+        blobs_dir = self.path(BLOBS_DIR)
+        for root, _, files in os.walk(blobs_dir):
+            if root == blobs_dir:
+                continue
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                stat = os.stat(path)
+                if stat.st_nlink == 1:
+                    yield path, stat.st_size
@@ -0,0 +1,222 @@
+import io
+import random
+from itertools import accumulate
+
+from api.cache import bump_version
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Max
+from PIL import Image
+from users.models import Subscription
+from users.versions import USERS_NAMESPACE
+
+from . import feed, search
+from .matching import recipe_matcher
+from .models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingCart, Tag, TagInRecipe)
+from .utils import batches
+
+User = get_user_model()
+
+SYNTHETIC_DOMAIN = 'synthetic.test'
+IMAGE_NAME = 'recipes/images/synthetic.png'
+MAX_SAMPLE_ROUNDS = 5
+
+
+class Skewed:
+
+    def __init__(self, items, exponent, rng):
+        self.items = list(items)
+        self.rng = rng
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent for rank in range(1, len(self.items) + 1)
+        ))
+
+    def pick(self):
+        return self.rng.choices(self.items, cum_weights=self.cum_weights)[0]
+
+    def sample(self, amount, exclude=None):
+        amount = min(amount, len(self.items))
+        picked = set()
+        for _ in range(MAX_SAMPLE_ROUNDS):
+            if len(picked) >= amount:
+                break
+            picked.update(self.rng.choices(
+                self.items,
+                cum_weights=self.cum_weights,
+                k=amount - len(picked)
+            ))
+            picked.discard(exclude)
+        return picked
+
+
+def synthetic_users():
+    return User.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}')
+
+
+def insert(model, objects):
+    if connection.features.can_return_ids_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+    last_id = model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+    model.objects.bulk_create(objects)
+    ids = model.objects.filter(pk__gt=last_id).order_by('pk').values_list(
+        'pk', flat=True
+    )
+    for obj, pk in zip(objects, ids):
+        obj.pk = pk
+    return objects
+
+
+def placeholder_image():
+    if default_storage.exists(IMAGE_NAME):
+        return IMAGE_NAME
+    buffer = io.BytesIO()
+    Image.new('RGB', (640, 480), '#e0a050').save(buffer, 'PNG')
+    return default_storage.save(IMAGE_NAME, ContentFile(buffer.getvalue()))
+
+
+class SyntheticData:
+
+    def __init__(self, users, recipes, favorites, carts, subscriptions,
+                 ingredients, skew=1.1, seed=0, batch_size=1000):
+        self.users = users
+        self.recipes = recipes
+        self.favorites = favorites
+        self.carts = carts
+        self.subscriptions = subscriptions
+        self.ingredients = ingredients
+        self.skew = skew
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.created = dict.fromkeys(
+            ('users', 'recipes', 'ingredients', 'favorites', 'carts',
+             'subscriptions'),
+            0
+        )
+
+    def amount(self, mean):
+        if mean <= 0:
+            return 0
+        return round(self.rng.expovariate(1 / mean))
+
+    def generate(self):
+        ingredients = list(Ingredient.objects.values_list('pk', 'name'))
+        if not ingredients:
+            return None
+        self.rng.shuffle(ingredients)
+        tags = list(Tag.objects.values_list('pk', flat=True))
+        users = self.create_users()
+        authors = Skewed(users, self.skew, self.rng)
+        recipe_ids = self.create_recipes(
+            authors, Skewed(ingredients, self.skew, self.rng), tags
+        )
+        self.rng.shuffle(recipe_ids)
+        self.create_relations(
+            users, authors, Skewed(recipe_ids, self.skew, self.rng)
+        )
+        return self.created
+
+    def create_users(self):
+        offset = synthetic_users().count()
+        password = make_password(None)
+        users = []
+        for numbers in batches(range(offset, offset + self.users),
+                               self.batch_size):
+            with transaction.atomic():
+                users.extend(user.pk for user in insert(User, [
+                    User(
+                        email=f'user{number}@{SYNTHETIC_DOMAIN}',
+                        username=f'synthetic{number}',
+                        first_name='Пользователь',
+                        last_name=str(number),
+                        password=password
+                    )
+                    for number in numbers
+                ]))
+        self.created['users'] = len(users)
+        return users
+
+    def build_recipe(self, author_id, ingredients):
+        names = [name for _, name in ingredients]
+        return Recipe(
+            author_id=author_id,
+            name=f'{names[0].capitalize()} с {names[-1]}'[:200],
+            text='Возьмите: ' + ', '.join(names) + '.',
+            image=self.image,
+            cooking_time=max(1, min(
+                round(self.rng.lognormvariate(3.4, 0.6)), 600
+            ))
+        )
+
+    def create_recipes(self, authors, ingredients, tags):
+        self.image = placeholder_image()
+        recipe_ids = []
+        for numbers in batches(range(self.recipes), self.batch_size):
+            chosen = [
+                list(ingredients.sample(
+                    max(1, self.amount(self.ingredients))
+                ))
+                for _ in numbers
+            ]
+            with transaction.atomic():
+                recipes = insert(Recipe, [
+                    self.build_recipe(authors.pick(), recipe_ingredients)
+                    for recipe_ingredients in chosen
+                ])
+                links = IngredientInRecipe.objects.bulk_create([
+                    IngredientInRecipe(
+                        recipe_id=recipe.pk,
+                        ingredient_id=ingredient_id,
+                        amount=self.rng.randint(1, 500)
+                    )
+                    for recipe, recipe_ingredients in zip(recipes, chosen)
+                    for ingredient_id, _ in recipe_ingredients
+                ])
+                if tags:
+                    TagInRecipe.objects.bulk_create([
+                        TagInRecipe(recipe_id=recipe.pk, tag_id=tag_id)
+                        for recipe in recipes
+                        for tag_id in self.rng.sample(
+                            tags, self.rng.randint(1, min(3, len(tags)))
+                        )
+                    ])
+            recipe_ids.extend(recipe.pk for recipe in recipes)
+            self.created['ingredients'] += len(links)
+        self.created['recipes'] = len(recipe_ids)
+        return recipe_ids
+
+    def create_relations(self, users, authors, recipes):
+        relations = (
+            ('favorites', Favorites, recipes, 'recipe_id'),
+            ('carts', ShoppingCart, recipes, 'recipe_id'),
+            ('subscriptions', Subscription, authors, 'author_id'),
+        )
+        for user_ids in batches(users, self.batch_size):
+            with transaction.atomic():
+                for key, model, targets, field in relations:
+                    created = model.objects.bulk_create([
+                        model(user_id=user_id, **{field: target})
+                        for user_id in user_ids
+                        for target in self.targets(key, targets, user_id)
+                    ], ignore_conflicts=True)
+                    self.created[key] += len(created)
+
+    def targets(self, key, targets, user_id):
+        amount = self.amount(getattr(self, key))
+        if key == 'subscriptions':
+            return targets.sample(amount, exclude=user_id)
+        return targets.sample(amount)
+
+    def finalize(self):
+        recipes = Recipe.objects.filter(
+            author__in=synthetic_users()
+        ).order_by().only('pk', 'author_id', 'pub_date')
+        for batch in batches(recipes.iterator(), self.batch_size):
+            with transaction.atomic():
+                feed.publish(batch)
+                search.update(recipe.pk for recipe in batch)
+        recipe_matcher.invalidate()
+        bump_version(USERS_NAMESPACE)
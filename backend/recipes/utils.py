@@ -1,3 +1,6 @@
+from collections import defaultdict
+from itertools import islice
+
 Breakfast = '#FF0000'
 Dinner = '#0000FF'
 Supper = '#008000'
@@ -7,3 +10,18 @@ colors = (
     (Dinner, 'Обед'),
     (Supper, 'Ужин'),
 )
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, batch_size))
+
+
+def group_pairs(pairs):
+    groups = defaultdict(set)
+    for key, value in pairs:
+        groups[key].add(value)
+    return groups
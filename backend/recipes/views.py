@@ -1,29 +1,47 @@
 from api.filters import IngredientFilter, RecipeFilter
-from api.pagination import CustomPagination
+from api.metrics import time_serializer
+from api.mixins import (CachedListMixin, ConditionalGetMixin,
+                        SerializerTimingMixin)
+from api.pagination import (CustomPagination, FeedPagination,
+                            RecipePagination)
 from api.permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
-from django.db.models import Sum
-from django.http import HttpResponse
+from api.renderers import (CSVRenderer, NDJSONRenderer, PDFRenderer,
+                           PlainTextRenderer)
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from recipes.models import (Favorites, Ingredient, IngredientInRecipe, Recipe,
-                            ShoppingCart, Tag)
-from recipes.serializers import (FavoritesSerializer, IngredientSerializer,
-                                 RecipeCreateSerializer, RecipeViewSerializer,
-                                 ShoppingCartSerializer, TagSerializer)
+from recipes import detail_cache, feed
+from recipes.bulk import RecipeImporter, export_recipes
+from recipes.ingredient_index import ingredient_index
+from recipes.matching import recipe_matcher
+from recipes.models import Favorites, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.preferences import preferences_version
+from recipes.serializers import (CookQuerySerializer, FavoritesSerializer,
+                                 IngredientSerializer, RecipeCreateSerializer,
+                                 RecipeListSerializer, RecipeMatchSerializer,
+                                 RecipeViewSerializer, ShoppingCartSerializer,
+                                 TagSerializer)
+from recipes.shopping_list import (get_shopping_list, iter_csv, iter_txt,
+                                   render_pdf)
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from users.versions import profile_version
 
 
-class TagsViewSet(viewsets.ReadOnlyModelViewSet):
+class TagsViewSet(SerializerTimingMixin, CachedListMixin,
+                  viewsets.ReadOnlyModelViewSet):
+    cache_namespace = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = None
 
 
-class IngredientsViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientsViewSet(SerializerTimingMixin, CachedListMixin,
+                         viewsets.ReadOnlyModelViewSet):
+    cache_namespace = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -31,15 +49,75 @@ class IngredientsViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (DjangoFilterBackend, )
     filterset_class = IngredientFilter
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name is None:
+            return super().list(request, *args, **kwargs)
+        return Response(ingredient_index.search(
+            name,
+            measurement_unit=request.query_params.get('measurement_unit')
+        ))
 
-class RecipesViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all()
-    pagination_class = CustomPagination
+
+class RecipesViewSet(SerializerTimingMixin, ConditionalGetMixin,
+                     viewsets.ModelViewSet):
+    conditional_actions = ('retrieve',)
+    pagination_class = RecipePagination
     permission_classes = (IsAuthorOrReadOnly, )
     filter_backends = (DjangoFilterBackend, )
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        return Recipe.objects.with_related().with_user_flags(
+            self.request.user
+        )
+
+    def get_retrieve_validators(self, request):
+        try:
+            row = Recipe.objects.filter(pk=self.kwargs['pk']).values_list(
+                'pk', 'version', 'author_id'
+            ).first()
+        except ValueError:
+            return None
+        if row is None:
+            return None
+        pk, version, author_id = row
+        self.recipe_state = (
+            pk, version, detail_cache.detail_version(),
+            profile_version(author_id)
+        ), author_id
+        return (
+            'recipe', *self.recipe_state[0], preferences_version(request.user)
+        ), None
+
+    def retrieve(self, request, *args, **kwargs):
+        state = getattr(self, 'recipe_state', None)
+        if state is None or not detail_cache.cacheable(request):
+            return super().retrieve(request, *args, **kwargs)
+        parts, author_id = state
+        parts = (*parts, request.build_absolute_uri('/'))
+        recipe_id = parts[0]
+        content = detail_cache.get_detail(recipe_id, parts)
+        if content is None:
+            serializer = self.get_serializer(self.get_object())
+            content = detail_cache.render_detail(
+                serializer.data,
+                request.accepted_renderer,
+                self.get_renderer_context()
+            )
+            detail_cache.set_detail(recipe_id, parts, content)
+        return HttpResponse(
+            detail_cache.merge_user_flags(
+                content, request, recipe_id, author_id
+            ),
+            content_type=request.accepted_media_type
+        )
+
     def get_serializer_class(self):
+        if self.action in ('list', 'feed'):
+            return RecipeListSerializer
+        if self.action == 'cook':
+            return RecipeMatchSerializer
         if self.request.method == 'GET':
             return RecipeViewSerializer
         return RecipeCreateSerializer
@@ -55,7 +133,7 @@ class RecipesViewSet(viewsets.ModelViewSet):
         if request.method == 'POST':
             recipe = get_object_or_404(Recipe, pk=pk)
             favorite = Favorites.objects.create(user=user, recipe=recipe)
-            serializer = FavoritesSerializer(favorite)
+            serializer = time_serializer(FavoritesSerializer(favorite))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         favorite = get_object_or_404(Favorites, user=user, recipe__id=pk)
@@ -76,7 +154,9 @@ class RecipesViewSet(viewsets.ModelViewSet):
                 user=user,
                 recipe=recipe
             )
-            serializer = ShoppingCartSerializer(in_shopping_cart)
+            serializer = time_serializer(
+                ShoppingCartSerializer(in_shopping_cart)
+            )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         in_shopping_cart = get_object_or_404(
@@ -87,28 +167,125 @@ class RecipesViewSet(viewsets.ModelViewSet):
         in_shopping_cart.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='feed',
+        permission_classes=(IsAuthenticated, ),
+    )
+    def feed(self, request):
+        paginator = FeedPagination()
+        entries = paginator.paginate_feed(
+            lambda after, limit: feed.read(request.user, after, limit),
+            request,
+            Recipe
+        )
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for _, recipe_id in entries]
+        )
+        serializer = self.get_serializer(
+            [recipes[recipe_id] for _, recipe_id in entries
+             if recipe_id in recipes],
+            many=True
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='cook',
+    )
+    def cook(self, request):
+        query = CookQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        tag_ids = None
+        if params.get('tags'):
+            tag_ids = set(Tag.objects.filter(
+                slug__in=params['tags']
+            ).values_list('id', flat=True))
+        matches = recipe_matcher.match(
+            params['ingredients'],
+            tag_ids=tag_ids,
+            max_cooking_time=params.get('max_cooking_time'),
+            max_missing=params.get('max_missing')
+        )
+        paginator = CustomPagination()
+        page = paginator.paginate_queryset(matches, request, view=self)
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _, _ in page]
+        )
+        results = []
+        for recipe_id, matched, missing in page:
+            recipe = recipes.get(recipe_id)
+            if recipe is not None:
+                recipe.matched_ingredients = matched
+                recipe.missing_ingredients = missing
+                results.append(recipe)
+        serializer = self.get_serializer(results, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(
         detail=False,
         methods=('get',),
         url_path='download_shopping_cart',
-        permission_classes=(IsAuthenticated, )
+        permission_classes=(IsAuthenticated, ),
+        renderer_classes=(PlainTextRenderer, CSVRenderer, PDFRenderer),
     )
     def download_shopping_cart(self, request):
-        shopping_cart = IngredientInRecipe.objects.filter(
-            recipe__shopping_cart_recipe__user=request.user
-        ).values_list(
-            'ingredient__name', 'ingredient__measurement_unit'
-        ).order_by(
-            'ingredient__name'
-        ).annotate(
-            ingredient_total=Sum('amount')
+        file_format = request.accepted_renderer.format
+        if file_format == 'pdf':
+            response = HttpResponse(
+                render_pdf(request.user),
+                content_type='application/pdf'
+            )
+        else:
+            shopping_list = get_shopping_list(request.user)
+            if file_format == 'csv':
+                content = iter_csv(shopping_list)
+            else:
+                content = iter_txt(shopping_list)
+            response = StreamingHttpResponse(
+                content,
+                content_type=f'{request.accepted_media_type}; charset=utf-8'
+            )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping-list.{file_format}"'
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=('post',),
+        url_path='bulk_import',
+        permission_classes=(IsAuthenticated, ),
+    )
+    def bulk_import(self, request):
+        importer = RecipeImporter(
+            author=request.user,
+            trust_authors=request.user.is_superuser
+        )
+        report = importer.run(request.stream or ())
+        if report['created']:
+            return Response(report, status=status.HTTP_201_CREATED)
+        return Response(report, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='bulk_export',
+        renderer_classes=(NDJSONRenderer, ),
+        permission_classes=(IsAuthenticated, ),
+    )
+    def bulk_export(self, request):
+        queryset = self.filter_queryset(Recipe.objects.all())
+        if not request.user.is_superuser:
+            queryset = queryset.filter(author=request.user)
+        response = StreamingHttpResponse(
+            export_recipes(queryset),
+            content_type=f'{request.accepted_media_type}; charset=utf-8'
         )
-        text = 'Cписок покупок: \n'
-        for ingredients in shopping_cart:
-            name, measurement_unit, amount = ingredients
-            text += f'{name}: {amount} {measurement_unit}\n'
-        response = HttpResponse(text, content_type='text/plain')
         response['Content-Disposition'] = (
-            'attachment; filename="shopping-list.pdf"'
+            'attachment; filename="recipes.ndjson"'
         )
         return response
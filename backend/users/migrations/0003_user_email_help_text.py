@@ -0,0 +1,19 @@
+# Syncs User.email with the model: the help text typo was fixed without a
+# migration.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(error_messages={'unique': 'Этот email уже зарегистрирован!'}, help_text='Укажите адрес электронной почты', max_length=254, unique=True, verbose_name='Адрес электронной почты'),
+        ),
+    ]
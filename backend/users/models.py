@@ -34,10 +34,24 @@ class User(AbstractUser):
         help_text='Обязательное поле, не более 150 символов',
         max_length=150,
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Количество рецептов',
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков',
+        default=0,
+        editable=False,
+        db_index=True
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name', 'password')
 
+    load_deferred_together = False
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
@@ -52,6 +66,11 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    def refresh_from_db(self, using=None, fields=None):
+        if fields is not None and self.load_deferred_together:
+            fields = self.get_deferred_fields().union(fields)
+        super().refresh_from_db(using, fields)
+
 
 class Subscription(models.Model):
     user = models.ForeignKey(
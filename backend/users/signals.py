@@ -0,0 +1,41 @@
+from api.authentication import revoke_user_tokens, token_cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from recipes.counters import decrement, increment
+from recipes.preferences import bump_preferences_version
+from rest_framework.authtoken.models import Token
+
+from .models import Subscription, User
+from .versions import bump_profile_version
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        increment(User, instance.author_id, 'followers_count')
+        bump_preferences_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    decrement(User, instance.author_id, 'followers_count')
+    bump_preferences_version(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, raw=False,
+               **kwargs):
+    if not raw and set(update_fields or ()) != {'last_login'}:
+        bump_profile_version(instance.pk)
+        if not created:
+            revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_profile_version(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.revoke(instance.key)
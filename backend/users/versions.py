@@ -0,0 +1,13 @@
+from api.cache import bump_version, get_version
+
+USERS_NAMESPACE = 'users'
+PROFILE_NAMESPACE = 'user:{user_id}'
+
+
+def profile_version(user_id):
+    return get_version(PROFILE_NAMESPACE.format(user_id=user_id))
+
+
+def bump_profile_version(user_id):
+    bump_version(PROFILE_NAMESPACE.format(user_id=user_id))
+    bump_version(USERS_NAMESPACE)
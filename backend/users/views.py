@@ -1,6 +1,15 @@
+from collections import defaultdict
+
+from api.cache import get_version
+from api.metrics import time_serializer
+from api.mixins import (ConditionalGetMixin, SerializerTimingMixin,
+                        query_parts)
 from api.pagination import CustomPagination
+from django.db.models import BooleanField, Value
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
+from recipes.models import Recipe
+from recipes.preferences import preferences_version
 from recipes.serializers import FollowSerializer, SubscriptionSerializer
 from rest_framework import status
 from rest_framework.decorators import action
@@ -8,13 +17,48 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from .models import Subscription, User
+from .versions import USERS_NAMESPACE, profile_version
+
+
+def get_recipes_limit(request):
+    try:
+        return max(int(request.query_params['recipes_limit']), 0)
+    except (KeyError, ValueError):
+        return None
 
 
-class CustomUserViewSet(UserViewSet):
+class CustomUserViewSet(SerializerTimingMixin, ConditionalGetMixin,
+                        UserViewSet):
+    conditional_actions = ('list', 'retrieve', 'get_self_page')
     pagination_class = CustomPagination
     lookup_field = 'id'
     search_fields = ('username',)
 
+    def with_preferences(self, request, *versions):
+        versions = (*versions, preferences_version(request.user))
+        return (request.user.pk, *versions), max(filter(None, versions))
+
+    def get_list_validators(self, request):
+        parts, last_modified = self.with_preferences(
+            request, get_version(USERS_NAMESPACE)
+        )
+        return (*parts, *query_parts(request)), last_modified
+
+    def get_retrieve_validators(self, request):
+        try:
+            user_id = User.objects.filter(pk=self.kwargs['id']).values_list(
+                'pk', flat=True
+            ).first()
+        except ValueError:
+            return None
+        if user_id is None:
+            return None
+        return self.with_preferences(request, profile_version(user_id))
+
+    def get_get_self_page_validators(self, request):
+        version = profile_version(request.user.pk)
+        return (version,), version
+
     @action(
         methods=('get',),
         url_path='me',
@@ -32,14 +76,22 @@ class CustomUserViewSet(UserViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def get_subscriptions(self, request):
-        queryset = self.paginate_queryset(
-            User.objects.filter(following__user=request.user)
+        authors = self.paginate_queryset(
+            User.objects.filter(following__user=request.user).annotate(
+                is_subscribed=Value(True, BooleanField())
+            )
         )
-        serializer = SubscriptionSerializer(
-            queryset,
+        recipes = defaultdict(list)
+        for recipe in Recipe.objects.latest_per_author(
+            [author.id for author in authors],
+            get_recipes_limit(request)
+        ):
+            recipes[recipe.author_id].append(recipe)
+        serializer = time_serializer(SubscriptionSerializer(
+            authors,
             many=True,
-            context={'request': request}
-        )
+            context={'request': request, 'recipes': recipes}
+        ))
         return self.get_paginated_response(serializer.data)
 
     @action(
@@ -53,10 +105,10 @@ class CustomUserViewSet(UserViewSet):
         author = get_object_or_404(User, id=id)
         if request.method == 'POST':
             data = {'user': user.id, 'author': id}
-            serializer = FollowSerializer(
+            serializer = time_serializer(FollowSerializer(
                 data=data,
                 context={'request': request}
-            )
+            ))
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)